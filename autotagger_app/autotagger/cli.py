@@ -0,0 +1,189 @@
+"""
+       Command line bulk tagger
+
+       Tags JSONL records, plain text lines or whole text files (or stdin) and streams
+       the tags with their scores out as JSONL, one output record per input record and
+       in input order. Each output record carries the byte offset just past its input
+       record, so an interrupted run over a single input can be resumed with --offset.
+       Records without an id (lines, text files and JSONL records lacking the id field)
+       are identified by the byte offset they start at, which a resumed run keeps.
+
+       python -m autotagger --format jsonl --workers 4 corpus.jsonl > tags.jsonl
+
+"""
+import argparse
+import io
+import json
+import sys
+
+from autotagger.tagger import Tagger
+
+FORMATS = [ 'jsonl', 'lines', 'text' ]
+
+BUFFER_SIZE = 1 << 20 # Inputs are read and the output is written through buffers of this many bytes
+
+# The tagger and options of this (worker) process
+_TAGGER = None
+_OPTIONS = None
+
+
+def main(argv=None):
+    options = _parseArguments(argv)
+
+    output = _openOutput(options.output)
+    records = _readRecords(options)
+
+    if options.workers > 1:
+        import multiprocessing
+        import threading
+        # The pool's task handler thread draws records as fast as it can, so only this many are let out ahead of the
+        # results written, which keeps the input streaming
+        window = threading.Semaphore(2 * options.workers * options.batch_size)
+        stopped = threading.Event()
+        pool = multiprocessing.Pool(options.workers, _initWorker, (options,))
+        # imap hands the records out in chunks and returns the results in input order
+        results = pool.imap(_tagRecord, _windowRecords(records, window, stopped), options.batch_size)
+    else:
+        pool = None
+        window = None
+        _initWorker(options)
+        results = (_tagRecord(record) for record in records)
+
+    try:
+        batch = []
+        for result in results:
+            if window is not None:
+                window.release()
+            batch.append(result)
+            if len(batch) >= options.batch_size:
+                _writeBatch(output, batch)
+                batch = []
+        _writeBatch(output, batch)
+    finally:
+        if pool is not None:
+            # Waking the task handler if it waits for room, the pool joins it when terminated
+            stopped.set()
+            window.release()
+            pool.terminate()
+        output.flush()
+        if output is not _binaryStream(sys.stdout):
+            output.close()
+    return 0
+
+
+def _parseArguments(argv):
+    parser = argparse.ArgumentParser(prog='python -m autotagger', description='Tags text in bulk and writes the tags as JSONL.')
+    parser.add_argument('files', nargs='*', help='input files, stdin is read if none are given')
+    parser.add_argument('--format', choices=FORMATS, default='jsonl',
+            help='jsonl: one JSON object per line, lines: one document per line, text: one document per file')
+    parser.add_argument('--text-field', default='text', help='JSONL field holding the text to tag')
+    parser.add_argument('--id-field', default='id', help='JSONL field copied to the output as the record id')
+    parser.add_argument('--encoding', default='utf-8')
+    parser.add_argument('-n', '--tags', type=int, default=10, help='number of tags to return per record')
+    parser.add_argument('--language', default=None, help='language pack to tag with')
+    parser.add_argument('--detect-language', action='store_true', help='detect the language of each record')
+    parser.add_argument('--workers', type=int, default=1, help='number of tagging processes')
+    parser.add_argument('--resources', default=None, help='resource segment the workers share (see autotagger.resources)')
+    parser.add_argument('--batch-size', type=int, default=100, help='records per output write (and per worker task)')
+    parser.add_argument('--offset', type=int, default=0, help='byte offset to resume the (first) input from')
+    parser.add_argument('-o', '--output', default=None, help='output file, stdout if not given')
+    options = parser.parse_args(argv)
+    if options.workers < 1 or options.batch_size < 1:
+        parser.error('--workers and --batch-size must be at least 1')
+    return options
+
+
+def _readRecords(options):
+    # Yields (source, byte offset of the record, raw record, byte offset after the record)
+    offset = options.offset
+    for source in (options.files or ['-']):
+        position = offset
+        offset = 0
+        if source == '-':
+            stream = _binaryStream(sys.stdin)
+            # stdin can't seek, so the bytes before the offset are read and dropped
+            remaining = position
+            while remaining > 0:
+                skipped = stream.read(min(remaining, BUFFER_SIZE))
+                if not skipped:
+                    break
+                remaining -= len(skipped)
+        else:
+            stream = io.open(source, 'rb', buffering=BUFFER_SIZE)
+            stream.seek(position)
+        try:
+            if options.format == 'text':
+                content = stream.read()
+                yield (source, position, content, position + len(content))
+            else:
+                for line in stream:
+                    start = position
+                    position += len(line)
+                    if line.strip():
+                        yield (source, start, line, position)
+        finally:
+            if stream is not _binaryStream(sys.stdin):
+                stream.close()
+
+
+def _windowRecords(records, window, stopped):
+    # Yields the records as the results of earlier ones are written (see main)
+    for record in records:
+        window.acquire()
+        if stopped.is_set():
+            return
+        yield record
+
+
+def _initWorker(options):
+    global _TAGGER, _OPTIONS
+    _OPTIONS = options
+    if options.resources is not None:
+        from autotagger.resources import attach
+        attach(options.resources)
+    _TAGGER = Tagger()
+    _TAGGER.DETECT_LANGUAGE = options.detect_language
+    _TAGGER.ENCODING = options.encoding
+    if options.detect_language:
+        from autotagger.detection import LanguageDetector
+        _TAGGER.languageDetector = LanguageDetector()
+        _TAGGER.languageDetector.ENCODING = options.encoding
+    if options.language is not None:
+        _TAGGER.LANGUAGE = options.language
+
+
+def _tagRecord(record):
+    source, start, raw, offset = record
+    result = { 'source' : source, 'offset' : offset, 'id' : start }
+    try:
+        if _OPTIONS.format == 'jsonl':
+            document = json.loads(raw.decode(_OPTIONS.encoding))
+            result['id'] = document.get(_OPTIONS.id_field, start)
+            text = document.get(_OPTIONS.text_field) or ''
+        else:
+            # The tagger reads the bytes itself, only decoding the terms it finds
+            text = raw
+
+        tagSet = _TAGGER.analyse_text(text, _OPTIONS.tags)
+        result['language'] = tagSet.language
+        result['tags'] = [ { 'tag' : term.getValue(), 'score' : term.getScore() } for term in tagSet.getTags()[:_OPTIONS.tags] ]
+    except Exception as e:
+        # A bad record shouldn't stop the run, it is reported in its place instead
+        result['error'] = '%s: %s' % (e.__class__.__name__, e)
+    return json.dumps(result, sort_keys=True)
+
+
+def _writeBatch(output, batch):
+    if batch:
+        output.write(('\n'.join(batch) + '\n').encode('utf-8'))
+
+
+def _openOutput(path):
+    if path is None or path == '-':
+        return _binaryStream(sys.stdout)
+    return io.open(path, 'wb', buffering=BUFFER_SIZE)
+
+
+def _binaryStream(stream):
+    # Python 3 text streams wrap a binary buffer, Python 2 streams are binary already
+    return getattr(stream, 'buffer', stream)
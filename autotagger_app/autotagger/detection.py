@@ -0,0 +1,110 @@
+"""
+       Language Detection
+
+       A cheap stopword based language detector. Only a prefix of the text is
+       looked at, and every token costs a single dictionary lookup against an
+       index built from the stopword lists of the candidate language packs, so
+       the detector is cheap enough to run in front of every call to the Tagger.
+
+"""
+import re
+
+from autotagger.languages import get_stopwords, LANGUAGE_MODULES, DEFAULT_LANGUAGE
+
+WORD_EXPRESSION = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+
+class LanguageDetector:
+    def __init__(self, languages=None):
+        self.PREFIX_LENGTH = 256 # Only the first n characters of the text are inspected
+        self.MINIMUM_TOKENS = 4 # Texts with fewer tokens than this in the prefix are not classified
+        self.MINIMUM_HIT_RATE = 0.15 # The winning language must have at least this fraction of tokens as stopwords
+        self.ENCODING = 'utf-8' # Encoding of bytes input, only the prefix is decoded
+
+        # Candidate languages, earlier languages win ties
+        if languages is None:
+            languages = [DEFAULT_LANGUAGE] + sorted(code for code in LANGUAGE_MODULES if code != DEFAULT_LANGUAGE)
+        self.languages = list(languages)
+
+        # Stopword -> indexes of the languages it belongs to, built on first use
+        self._index = None
+
+    def detect(self, text ):
+        scores = self.getScores(text)
+        if scores is None:
+            return None
+
+        best = None
+        for languageId in range(len(self.languages)):
+            if best is None or scores[languageId] > scores[best]:
+                best = languageId
+
+        if scores[best] < self.MINIMUM_HIT_RATE:
+            return None
+        return self.languages[best]
+
+    def getScores(self, text ):
+        # Returns the stopword hit rate per candidate language, or None if the prefix is too short to tell
+        index = self._getIndex()
+        prefix = text[:self.PREFIX_LENGTH]
+        if isinstance(prefix, memoryview):
+            prefix = prefix.tobytes()
+        if isinstance(prefix, (bytes, bytearray)) and not isinstance(prefix, str):
+            # A character cut off at the end of the prefix is dropped
+            prefix = prefix.decode(self.ENCODING, 'ignore')
+        tokens = WORD_EXPRESSION.findall(prefix.lower())
+        if len(tokens) < self.MINIMUM_TOKENS:
+            return None
+
+        hits = [0] * len(self.languages)
+        for token in tokens:
+            languageIds = index.get(token)
+            if languageIds is not None:
+                for languageId in languageIds:
+                    hits[languageId] += 1
+
+        return [float(count) / len(tokens) for count in hits]
+
+    def _getIndex(self):
+        if self._index is None:
+            index = {}
+            for languageId in range(len(self.languages)):
+                # Only the stopwords are read, the language packs are loaded when a text is tagged in their language
+                for stopword in get_stopwords(self.languages[languageId]):
+                    index.setdefault(stopword, []).append(languageId)
+            self._index = dict((stopword, tuple(languageIds)) for stopword, languageIds in index.items())
+        return self._index
+
+
+class LanguageRouter:
+    """
+       Routes each text to the Tagger configured for its language. Texts in a language
+       without a Tagger go to the default Tagger, or are skipped if there is none.
+    """
+    def __init__(self, taggers, defaultTagger=None, detector=None):
+        self.taggers = taggers
+        self.defaultTagger = defaultTagger
+        if detector is None:
+            detector = LanguageDetector(list(taggers.keys()) if defaultTagger is None else None)
+        self.detector = detector
+
+    def analyse_text(self, text, numberOfTagsToReturn ):
+        language = self.detector.detect(text)
+        tagger = self.taggers.get(language, self.defaultTagger)
+        if tagger is None:
+            return None
+        if language is None:
+            return tagger.analyse_text(text, numberOfTagsToReturn)
+        return tagger.analyse_text(text, numberOfTagsToReturn, language)
+
+
+# Encoding of bytes input -> detector shared by the Taggers reading bytes in it
+_DEFAULT_DETECTORS = {}
+
+def get_language_detector(encoding='utf-8'):
+    # The detector shared by all Taggers that detect the language of their input
+    detector = _DEFAULT_DETECTORS.get(encoding)
+    if detector is None:
+        detector = _DEFAULT_DETECTORS[encoding] = LanguageDetector()
+        detector.ENCODING = encoding
+    return detector
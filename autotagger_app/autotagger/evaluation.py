@@ -0,0 +1,144 @@
+"""
+       Configuration Sweep Evaluation
+
+       Evaluates many Tagger configurations against a labelled set of texts. Each text
+       is tokenised and its candidates extracted (the 1st pass) once per distinct set of
+       extraction parameters, and the cached frequency lists are then only re-scored
+       (the 2nd and 3rd pass) for every configuration, in parallel. Reports precision@k
+       and recall@k per configuration along with the time spent.
+
+       evaluator = SweepEvaluator([(text, ['tag', ...]), ...], k=10)
+       results = evaluator.evaluate(parameter_grid({'BIGRAM_BOOST' : [1.5, 2.5], 'SINGLE_TERM_BOOST' : [0.5, 0.75]}))
+
+"""
+import itertools
+import timeit
+
+from autotagger.tagger import Tagger, FrequencyListSet, TermConstants
+
+# Tagger parameters that are applied by the 1st pass, any other parameter only changes scoring
+EXTRACTION_PARAMETERS = [ 'REMOVE_SHORT_NUMBERS_AS_SINGLE_TOKENS', 'EXTRACT_SPECIAL_TERMS', 'TOKEN_LENGTH_CUTOFF', 'SHORT_NUMBERS_EXPRESSION',
+        'MAX_NGRAM_LENGTH', 'LANGUAGE', 'MAX_TEXT_LENGTH', 'SAMPLE_LONG_TEXTS', 'SAMPLE_WINDOWS', 'MAX_UNIQUE_TERMS', 'ENCODING', 'CHUNK_SIZE' ]
+
+# The boosts given to candidates by the 1st pass, these are re-applied to the cached candidates for every configuration
+BASE_BOOSTS = {
+        TermConstants['TYPE_SINGLE_TERM'] : 'SINGLE_TERM_BOOST',
+        TermConstants['TYPE_SPECIAL_TERM'] : 'SPECIAL_TERM_BOOST',
+        TermConstants['TYPE_CAPITALISED_COMPOUND_TERM'] : 'NGRAM_BASED_ON_CAPITALISATION_BOOST',
+        TermConstants['TYPE_SIMPLE_BIGRAM_TERM'] : 'BIGRAM_BOOST'
+}
+
+# Cached candidates and labels of the documents in this (worker) process
+_CANDIDATES = None
+_LABELS = None
+_K = None
+
+
+def parameter_grid(grid ):
+    # Every combination of the given parameter values, e.g. { 'BIGRAM_BOOST' : [1, 2] } -> [ { 'BIGRAM_BOOST' : 1 }, { 'BIGRAM_BOOST' : 2 } ]
+    names = sorted(grid.keys())
+    return [ dict(zip(names, values)) for values in itertools.product(*[grid[name] for name in names]) ]
+
+
+class SweepEvaluator:
+    def __init__(self, documents, k=10, workers=None ):
+        # documents is a list of (text, list of expected tags)
+        self.texts = [ text for text, labels in documents ]
+        self.labels = [ [ label.lower() for label in labels ] for text, labels in documents ]
+        self.k = k
+        self.workers = workers # Number of processes, all CPUs if None and no parallelism if 1
+
+        # Extraction parameter values -> serialised frequency lists of every document
+        self._candidateCache = {}
+
+    def evaluate(self, parameterSets ):
+        # Returns one result per parameter set, in the same order:
+        # { 'parameters', 'precision', 'recall', 'seconds' } plus the extraction time under 'extractionSeconds'
+        groups = {}
+        for index in range(len(parameterSets)):
+            groups.setdefault(_extractionKey(parameterSets[index]), []).append(index)
+
+        results = [ None ] * len(parameterSets)
+        for key in sorted(groups.keys(), key=repr):
+            extractionSeconds = self._extract(key)
+            tasks = [ (index, parameterSets[index]) for index in groups[key] ]
+            for index, precision, recall, seconds in self._map(_scoreParameterSet, tasks, self._candidateCache[key]):
+                results[index] = { 'parameters' : parameterSets[index], 'precision' : precision, 'recall' : recall,
+                        'seconds' : seconds, 'extractionSeconds' : extractionSeconds }
+        return results
+
+    def _extract(self, key ):
+        # Running the 1st pass over all documents for a set of extraction parameters, once
+        if key in self._candidateCache:
+            return 0.0
+        start = timeit.default_timer()
+        tasks = [ (text, key) for text in self.texts ]
+        self._candidateCache[key] = self._map(_extractCandidates, tasks)
+        return timeit.default_timer() - start
+
+    def _map(self, function, tasks, candidates=None ):
+        if self.workers == 1:
+            _initWorker(candidates, self.labels, self.k)
+            return [ function(task) for task in tasks ]
+
+        import multiprocessing
+        pool = multiprocessing.Pool(self.workers, _initWorker, (candidates, self.labels, self.k))
+        try:
+            return pool.map(function, tasks)
+        finally:
+            pool.terminate()
+
+
+def best(results, metric='precision' ):
+    return max(results, key=lambda result: result[metric])
+
+
+def _extractionKey(parameters ):
+    return tuple( (name, parameters[name]) for name in EXTRACTION_PARAMETERS if name in parameters )
+
+
+def _configureTagger(parameters ):
+    tagger = Tagger()
+    for name, value in parameters.items():
+        if not hasattr(tagger, name):
+            raise ValueError('Unknown Tagger parameter: %s' % name)
+        setattr(tagger, name, value)
+    return tagger
+
+
+def _initWorker(candidates, labels, k ):
+    global _CANDIDATES, _LABELS, _K
+    _CANDIDATES = candidates
+    _LABELS = labels
+    _K = k
+
+
+def _extractCandidates(task ):
+    text, key = task
+    tagger = _configureTagger(dict(key))
+    return tagger.extract_candidates(text).toBytes(False)
+
+
+def _scoreParameterSet(task ):
+    index, parameters = task
+    start = timeit.default_timer()
+    tagger = _configureTagger(parameters)
+
+    precision = 0.0
+    recall = 0.0
+    for documentId in range(len(_CANDIDATES)):
+        frequencyLists = FrequencyListSet.fromBytes(_CANDIDATES[documentId])
+        # Re-applying the 1st pass boosts of this configuration
+        for frequencyList in frequencyLists.getLists():
+            for term in frequencyList.getTerms().values():
+                term.setBoost(getattr(tagger, BASE_BOOSTS[term.termType]))
+
+        tags = [ term.getValue().lower() for term in tagger.score_candidates(frequencyLists, _K).getTags()[:_K] ]
+        labels = _LABELS[documentId]
+        hits = len(set(tags) & set(labels))
+        precision += float(hits) / _K
+        if labels:
+            recall += float(hits) / len(labels)
+
+    documents = max(len(_CANDIDATES), 1)
+    return index, precision / documents, recall / documents, timeit.default_timer() - start
@@ -0,0 +1,282 @@
+"""
+       Near-Duplicate Detection
+
+       SimHash and MinHash signatures computed from the normalised token stream the
+       Tagger builds anyway (see Tagger.FINGERPRINT and Tagger.tokenize), in-process
+       LSH indexes to look up near-duplicates by signature, and NearDuplicateTagger,
+       which reuses the tags of a near-duplicate instead of scoring the text again.
+
+"""
+from collections import OrderedDict
+import hashlib
+
+from autotagger.tagger import TagSet
+
+MASK_64 = (1 << 64) - 1
+
+SIMHASH_BITS = 64
+MINHASH_PERMUTATIONS = 64
+MINHASH_SHINGLE_SIZE = 2 # MinHash compares sets of word n-grams (shingles) of this length
+
+# SimHash counts the votes for all bits at once in lanes of a single integer, each lane this many bits wide.
+# Texts with more tokens than a lane can count are counted bit by bit instead
+_LANE_WIDTH = 24
+_LANE_MASK = (1 << _LANE_WIDTH) - 1
+
+# Token -> (64 bit hash, hash spread out into lanes), tokens repeat a lot across documents so these are cached (and the cache bounded)
+_TOKEN_HASHES = {}
+_TOKEN_HASH_CACHE_SIZE = 50000
+
+
+def fingerprint(tokens, method ):
+    if method == 'simhash':
+        return simhash(tokens)
+    elif method == 'minhash':
+        return minhash(tokens)
+    raise ValueError('Unknown fingerprint method: %s' % method)
+
+
+def simhash(tokens ):
+    # Every token votes on every bit of the 64 bit signature, a bit is set if most tokens have it set.
+    # Adding a token's spread hash counts its set bits in all 64 lanes with a single addition
+    counts = {}
+    for token in tokens:
+        counts[token] = counts.get(token, 0) + 1
+
+    total = len(tokens)
+    if total > _LANE_MASK:
+        votes = [0] * SIMHASH_BITS
+        for token, count in counts.items():
+            tokenHash = _hashToken(token)[0]
+            for bit in range(SIMHASH_BITS):
+                if tokenHash >> bit & 1:
+                    votes[bit] += count
+    else:
+        ones = 0
+        for token, count in counts.items():
+            ones += count * _hashToken(token)[1]
+        votes = [ones >> (bit * _LANE_WIDTH) & _LANE_MASK for bit in range(SIMHASH_BITS)]
+
+    signature = 0
+    for bit in range(SIMHASH_BITS):
+        if 2 * votes[bit] > total:
+            signature |= 1 << bit
+    return signature
+
+
+def minhash(tokens, permutations=MINHASH_PERMUTATIONS, shingleSize=MINHASH_SHINGLE_SIZE ):
+    # One permutation hashing: each shingle hash falls into one of the bins and every bin keeps its minimum,
+    # which takes a single pass instead of one pass per permutation
+    signature = [None] * permutations
+    for shingle in _shingleHashes(tokens, shingleSize):
+        binId = shingle % permutations
+        value = shingle // permutations
+        if signature[binId] is None or value < signature[binId]:
+            signature[binId] = value
+
+    # Densification, empty bins borrow the value of the next non-empty bin (offset by the distance to it)
+    filled = list(signature)
+    if filled.count(None) == permutations:
+        return tuple([MASK_64] * permutations)
+    for binId in range(permutations):
+        if filled[binId] is None:
+            distance = 1
+            while filled[(binId + distance) % permutations] is None:
+                distance += 1
+            signature[binId] = filled[(binId + distance) % permutations] + distance * (MASK_64 // permutations + 1)
+    return tuple(signature)
+
+
+def hamming_distance(signature1, signature2 ):
+    return bin(signature1 ^ signature2).count('1')
+
+
+def estimate_jaccard(signature1, signature2 ):
+    # The fraction of MinHash values two signatures share estimates the Jaccard similarity of their shingles
+    matches = 0
+    for i in range(len(signature1)):
+        if signature1[i] == signature2[i]:
+            matches += 1
+    return float(matches) / len(signature1)
+
+
+class MinHashIndex:
+    """
+       LSH index over MinHash signatures, split into bands of rows values. Texts sharing
+       all the values of any band are candidates, which are then checked against the
+       similarity threshold.
+    """
+    def __init__(self, bands=16, rows=4, threshold=0.8 ):
+        self.bands = bands
+        self.rows = rows
+        self.threshold = threshold
+        self._buckets = [{} for band in range(bands)]
+        self._signatures = {}
+
+    def add(self, key, signature ):
+        self._signatures[key] = signature
+        for band, bucketKey in self._bandKeys(signature):
+            self._buckets[band].setdefault(bucketKey, set()).add(key)
+
+    def remove(self, key ):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, bucketKey in self._bandKeys(signature):
+            bucket = self._buckets[band].get(bucketKey)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][bucketKey]
+
+    def query(self, signature ):
+        # Keys of the indexed texts similar to the signature, most similar first
+        candidates = set()
+        for band, bucketKey in self._bandKeys(signature):
+            candidates.update(self._buckets[band].get(bucketKey, ()))
+        scored = [(estimate_jaccard(signature, self._signatures[key]), key) for key in candidates]
+        return [key for similarity, key in sorted(scored, key=lambda item: -item[0]) if similarity >= self.threshold]
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _bandKeys(self, signature ):
+        for band in range(self.bands):
+            yield band, tuple(signature[band * self.rows:(band + 1) * self.rows])
+
+
+class SimHashIndex:
+    """
+       Index over SimHash signatures. The signature is split into maxDistance + 1 blocks,
+       so two signatures within maxDistance bits of each other share at least one block.
+    """
+    def __init__(self, maxDistance=6, bits=SIMHASH_BITS ):
+        self.maxDistance = maxDistance
+        self.bits = bits
+        self._blocks = []
+        blockCount = maxDistance + 1
+        for block in range(blockCount):
+            start = bits * block // blockCount
+            end = bits * (block + 1) // blockCount
+            self._blocks.append((start, (1 << (end - start)) - 1))
+        self._buckets = [{} for block in self._blocks]
+        self._signatures = {}
+
+    def add(self, key, signature ):
+        self._signatures[key] = signature
+        for block, bucketKey in self._blockKeys(signature):
+            self._buckets[block].setdefault(bucketKey, set()).add(key)
+
+    def remove(self, key ):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for block, bucketKey in self._blockKeys(signature):
+            bucket = self._buckets[block].get(bucketKey)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[block][bucketKey]
+
+    def query(self, signature ):
+        # Keys of the indexed texts within maxDistance bits of the signature, closest first
+        candidates = set()
+        for block, bucketKey in self._blockKeys(signature):
+            candidates.update(self._buckets[block].get(bucketKey, ()))
+        scored = [(hamming_distance(signature, self._signatures[key]), key) for key in candidates]
+        return [key for distance, key in sorted(scored, key=lambda item: item[0]) if distance <= self.maxDistance]
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _blockKeys(self, signature ):
+        for block in range(len(self._blocks)):
+            start, mask = self._blocks[block]
+            yield block, signature >> start & mask
+
+
+class NearDuplicateTagger:
+    """
+       Wraps a Tagger so that a text that is a near-duplicate of a recently tagged text
+       gets the cached tags of that text. Texts are still tokenised (that is what the
+       fingerprint is computed from), but the scoring passes are skipped on a hit. Every
+       call gets a TagSet of its own, and a text is scored after all if it asks for more
+       tags than its near-duplicate was scored for.
+    """
+    def __init__(self, tagger, method='minhash', index=None, maxEntries=10000 ):
+        self.tagger = tagger
+        self.tagger.FINGERPRINT = method
+        if index is None:
+            if method == 'simhash':
+                index = SimHashIndex()
+            else:
+                index = MinHashIndex()
+        self.index = index
+        self.maxEntries = maxEntries
+        self._results = OrderedDict()
+        self._nextKey = 0
+
+    def analyse_text(self, text, numberOfTagsToReturn, language=None ):
+        frequencyLists = self.tagger.extract_candidates( text, language )
+
+        for key in self.index.query( frequencyLists.fingerprint ):
+            tagSet, scoredTags = self._results[key]
+            if tagSet.language == frequencyLists.language and ( numberOfTagsToReturn <= scoredTags or len(tagSet.tags) < scoredTags ):
+                # All the tags the near-duplicate had are wanted, or there are enough of them
+                return _copyTagSet( tagSet, numberOfTagsToReturn, frequencyLists.fingerprint )
+
+        tagSet = self.tagger.score_candidates( frequencyLists, numberOfTagsToReturn )
+        self._remember( tagSet, numberOfTagsToReturn )
+        return _copyTagSet( tagSet, numberOfTagsToReturn, tagSet.fingerprint )
+
+    def _remember(self, tagSet, scoredTags ):
+        # The cached tag set is never handed out, callers get copies of it
+        key = self._nextKey
+        self._nextKey += 1
+        self._results[key] = ( tagSet, scoredTags )
+        self.index.add( key, tagSet.fingerprint )
+
+        # Forgetting the oldest results once the cache is full
+        while len(self._results) > self.maxEntries:
+            oldestKey, oldestResult = self._results.popitem(last=False)
+            self.index.remove( oldestKey )
+
+
+def _copyTagSet(tagSet, numberOfTagsToReturn, fingerprint ):
+    # The first tags of a cached tag set, in a tag set (and terms) of their own, with the fingerprint of the text asking
+    copy = TagSet()
+    copy.language = tagSet.language
+    copy.fingerprint = fingerprint
+    copy.approximations = list(tagSet.approximations)
+    copy.tags = [term.copy() for term in tagSet.tags[:numberOfTagsToReturn]]
+    return copy
+
+
+def _hashToken(token ):
+    hashes = _TOKEN_HASHES.get(token)
+    if hashes is None:
+        if len(_TOKEN_HASHES) >= _TOKEN_HASH_CACHE_SIZE:
+            _TOKEN_HASHES.clear()
+        # A stable hash (unlike hash()) so that signatures can be compared across processes
+        tokenHash = int(hashlib.md5(token.encode('utf-8')).hexdigest()[:16], 16)
+        spread = 0
+        for bit in range(SIMHASH_BITS):
+            if tokenHash >> bit & 1:
+                spread |= 1 << (bit * _LANE_WIDTH)
+        hashes = _TOKEN_HASHES[token] = (tokenHash, spread)
+    return hashes
+
+
+def _shingleHashes(tokens, shingleSize ):
+    hashes = [_hashToken(token)[0] for token in tokens]
+    if not hashes:
+        return set()
+    if len(hashes) < shingleSize:
+        shingleSize = len(hashes)
+    shingles = set()
+    for start in range(len(hashes) - shingleSize + 1):
+        shingle = 0
+        for tokenHash in hashes[start:start + shingleSize]:
+            shingle = ((shingle << 7 | shingle >> 57) ^ tokenHash) & MASK_64
+        shingles.add(shingle)
+    return shingles
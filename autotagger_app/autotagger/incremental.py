@@ -0,0 +1,169 @@
+"""
+       Incremental Tagging
+
+       Re-tags edited documents without analysing the unchanged parts again. A text is
+       split into paragraphs at its line breaks, which are boundaries (see
+       AUTOTAGS['BOUNDARY']) that no candidate term spans, so the frequency lists of
+       the paragraphs merge into exactly the lists of the whole text. The lists of
+       every paragraph are cached by a hash of its content, and for each document
+       the merged lists are kept up to date by taking the paragraphs that went away
+       out and merging the new ones in. Only new paragraphs are analysed, the
+       scoring passes still run over all candidates of the document.
+
+"""
+from collections import OrderedDict
+import hashlib
+
+from autotagger.tagger import FrequencyListSet, TagSet
+
+
+class IncrementalTagger:
+    """
+       Wraps a Tagger, texts passed with a document id are re-tagged incrementally
+       against the last version of that document. The language of a text is not
+       detected per paragraph, pass it in unless it is the Tagger's LANGUAGE (or
+       the Tagger detects it). Texts are taken as str, not bytes, and text limits (MAX_TEXT_LENGTH) apply per paragraph.
+    """
+    def __init__(self, tagger, maxSegments=100000, maxDocuments=1000 ):
+        self.tagger = tagger
+        self.maxSegments = maxSegments
+        self.maxDocuments = maxDocuments
+        # (language, content hash) -> frequency lists of a paragraph, least recently used first
+        self._segments = OrderedDict()
+        # Document id -> _Document, least recently used first
+        self._documents = OrderedDict()
+
+    def analyse_text(self, text, numberOfTagsToReturn, language=None, documentId=None ):
+        language = self._getLanguage( text, language )
+        if language is None:
+            return TagSet()
+
+        document = None
+        previousSegments = {}
+        if documentId is not None:
+            document = self._documents.pop( documentId, None )
+            if document is not None:
+                previousSegments = document.segments
+
+        keys = []
+        segments = {}
+        for segment in _splitSegments( text ):
+            key = (language, _hashSegment( segment ))
+            keys.append( key )
+            if key not in segments:
+                # The paragraphs of the last version are taken from the document, only new ones go through the cache
+                frequencyLists = previousSegments.get( key )
+                if frequencyLists is None or frequencyLists.vocabulary is not self.tagger.languagePack.vocabulary:
+                    frequencyLists = self._getSegment( key, segment, language )
+                segments[key] = frequencyLists
+
+        if documentId is None:
+            frequencyLists = FrequencyListSet( language )
+            for key in keys:
+                frequencyLists.merge( segments[key] )
+        else:
+            if document is None or not document.update( keys, segments ):
+                document = _Document( language, keys, segments )
+            self._documents[documentId] = document
+            while len(self._documents) > self.maxDocuments:
+                self._documents.popitem( last=False )
+            # Scoring changes the terms, so the document's lists are scored as a copy
+            frequencyLists = document.frequencyLists.copy()
+
+        return self.tagger.score_candidates( frequencyLists, numberOfTagsToReturn )
+
+    def forget(self, documentId ):
+        self._documents.pop( documentId, None )
+
+    def _getLanguage(self, text, language ):
+        if language is None:
+            if self.tagger.DETECT_LANGUAGE:
+                language = self.tagger._getLanguageDetector().detect( text )
+                if language is None and self.tagger.SKIP_UNDETECTED_LANGUAGE:
+                    return None
+            if language is None:
+                language = self.tagger.LANGUAGE
+        return self.tagger._setLanguagePack( language ).code
+
+    def _getSegment(self, key, segment, language ):
+        frequencyLists = self._segments.pop( key, None )
+        if frequencyLists is None or frequencyLists.vocabulary is not self.tagger.languagePack.vocabulary:
+            # New paragraphs, and paragraphs analysed before the language pack started a new vocabulary, are analysed
+            frequencyLists = self.tagger.extract_candidates( segment, language )
+        self._segments[key] = frequencyLists
+        while len(self._segments) > self.maxSegments:
+            self._segments.popitem( last=False )
+        return frequencyLists
+
+
+class _Document:
+    # The paragraphs of the last version of a document and their merged frequency lists
+    def __init__(self, language, keys, segments ):
+        self.keys = keys
+        self.segments = segments
+        self.frequencyLists = FrequencyListSet( language )
+        for key in keys:
+            self.frequencyLists.merge( segments[key] )
+
+    def update(self, keys, segments ):
+        # Brings the merged lists up to date with a new version of the document, False if they have to be rebuilt
+        for frequencyLists in list(self.segments.values()) + list(segments.values()):
+            if frequencyLists.vocabulary is not self.frequencyLists.vocabulary or frequencyLists.language != self.frequencyLists.language:
+                return False
+
+        counts = _countKeys( keys )
+        oldCounts = _countKeys( self.keys )
+        # Paragraphs that were moved around would change which variant of a term comes last
+        if [key for key in self.keys if key in counts] != [key for key in keys if key in oldCounts]:
+            return False
+
+        changedTerms = [ set() for frequencyList in self.frequencyLists.getLists() ]
+        for key, count in oldCounts.items():
+            for i in range(count - counts.get(key, 0)):
+                self._changeSegment( self.segments[key], changedTerms, self.frequencyLists.subtract )
+        for key, count in counts.items():
+            for i in range(count - oldCounts.get(key, 0)):
+                self._changeSegment( segments[key], changedTerms, self.frequencyLists.merge )
+
+        self.keys = keys
+        self.segments = segments
+        self._restoreVariants( changedTerms )
+        return True
+
+    def _changeSegment(self, frequencyLists, changedTerms, change ):
+        change( frequencyLists )
+        for listId, frequencyList in enumerate(frequencyLists.getLists()):
+            changedTerms[listId].update( frequencyList.getTerms() )
+
+    def _restoreVariants(self, changedTerms ):
+        # Like addTerm the merged lists keep the variant of a term from its last occurrence, which is looked up
+        # again (from the end of the document) for the terms of the paragraphs that were taken out or merged in
+        ownLists = self.frequencyLists.getLists()
+        for listId in range(len(ownLists)):
+            for termId in changedTerms[listId]:
+                term = ownLists[listId].getTermById( termId )
+                if term == None:
+                    continue
+                for key in reversed(self.keys):
+                    segmentTerm = self.segments[key].getLists()[listId].getTermById( termId )
+                    if segmentTerm != None:
+                        if segmentTerm.getValue() != term.getValue():
+                            term.setValue( segmentTerm.getValue() )
+                        break
+
+
+def _splitSegments(text ):
+    return [segment for segment in text.split('\n') if segment.strip()]
+
+
+def _hashSegment(segment ):
+    if not isinstance(segment, bytes):
+        segment = segment.encode('utf-8')
+    return hashlib.md5( segment ).digest()
+
+
+def _countKeys(keys ):
+    counts = {}
+    for key in keys:
+        counts[key] = counts.get(key, 0) + 1
+    return counts
@@ -0,0 +1,222 @@
+"""
+       Language Packs
+
+       A language pack bundles everything the tagger needs that is specific to a
+       language: the stopword list, the stemmer and the character classes used by
+       the regular expressions. Packs are registered by module name and are only
+       imported the first time they are asked for, after which the compiled
+       resources are shared by every Tagger in the process.
+
+"""
+import importlib
+
+from autotagger.vocabulary import Vocabulary
+
+DEFAULT_LANGUAGE = 'en'
+
+# Language code -> module providing the language specific resources
+LANGUAGE_MODULES = {
+        'en' : 'autotagger.languages.en',
+        'de' : 'autotagger.languages.de',
+        'es' : 'autotagger.languages.es',
+        'fr' : 'autotagger.languages.fr',
+        'it' : 'autotagger.languages.it',
+        'nl' : 'autotagger.languages.nl',
+        'pt' : 'autotagger.languages.pt',
+        'sv' : 'autotagger.languages.sv'
+}
+
+# Loaded packs, keyed by language code
+_LANGUAGE_PACKS = {}
+
+# Resource segment the packs look their stopwords and vocabulary up in (see autotagger.resources)
+_RESOURCE_SEGMENT = None
+
+# Punctuation (and certain whitespace) that is swapped for a boundary marker, this is not language specific
+BOUNDARY_EXPRESSION = r"([ ]*[\.\!\?\:\;\n\r\f\t][ ]*)+"
+
+
+class LanguagePack:
+    def __init__(self, code, module):
+        # Imported here rather than at module level so that importing the tagger doesn't pay for the regex engine
+        import re
+
+        self.code = code
+        self.stopwords = module.STOPWORDS
+
+        upper = module.UPPERCASE_CHARACTERS
+        lower = module.LOWERCASE_CHARACTERS
+        letters = upper + lower
+        word = getattr(module, 'WORD_CHARACTERS', letters + '0-9_')
+        connector = getattr(module, 'NGRAM_CONNECTOR', '')
+        namePrefix = getattr(module, 'NAME_PREFIX', '')
+
+        classes = { 'upper' : upper, 'lower' : lower, 'letters' : letters, 'connector' : connector, 'prefix' : namePrefix }
+        self._patterns = {
+            # Remove all whitespace characters (certain white space characters are turned into boundaries)
+            'whitespace' : r"(\')?([^" + word + r"\.\!\?\:\;\n\r\f\t])",
+            # Look for compound terms (bi- and trigrams) based on capitalization, accounting for corner cases like PayPal, McKinley etc.
+            'capitalizedNGram' : r"(([%(upper)s][%(lower)s]*)?[%(upper)s][%(lower)s]+ (%(connector)s)?(%(prefix)s)?[%(upper)s][%(lower)s]+([ \-][%(upper)s][%(lower)s]+)?([ ][%(upper)s][%(lower)s]+)?)" % classes,
+            # Special Terms Expression to extract e.g. abbreviations and acronyms (with support for CamelCase words like JavaScript)
+            'specialTerms' : r"\b([%(letters)s]{1,2}\-[%(letters)s]+)|(([%(upper)s]\.){2,})|((([%(upper)s][%(upper)s0-9\-\:\_\+]+)|([%(upper)s]+[%(lower)s]*?[%(upper)s][%(lower)s]*?))( [%(upper)s][%(letters)s]+)?( [%(upper)s][%(letters)s]+)?( [0-9]*(\.[0-9]*)?)?)\b" % classes,
+            'boundary' : BOUNDARY_EXPRESSION
+        }
+        self.whitespaceExpression = re.compile(self._patterns['whitespace'])
+        self.capitalizedNGramExpression = re.compile(self._patterns['capitalizedNGram'])
+        self.specialTermsExpression = re.compile(self._patterns['specialTerms'])
+        self.boundaryExpression = re.compile(self._patterns['boundary'])
+
+        # The stemmer is optional, languages without one are matched on the lowercased token
+        self._stemmerFactory = getattr(module, 'get_stemmer', None)
+        self._stemmer = None
+        # Interned term ids of all the texts tagged with this pack, see resetVocabulary
+        self.vocabulary = Vocabulary(self._stem)
+        self._stopWordExpressions = {}
+        # The expressions compiled for bytes input, False if the pack can't match bytes
+        self._binaryExpressions = None
+
+    def resetVocabulary(self):
+        # Starting a new vocabulary, frequency lists built before keep (and key on) the old one until they are dropped
+        self.vocabulary = Vocabulary(self._stem, self.vocabulary.MAX_SIZE, self.vocabulary.base)
+        return self.vocabulary
+
+    def useResourceSegment(self, segment):
+        # Taking the stopwords and the vocabulary from a shared segment, only the terms it lacks are interned locally.
+        # The stopwords are looked up for every token and only take a few KB, so they are read into a dict (like the STOPWORDS of the language modules)
+        stopwords = segment.getStopwords(self.code)
+        if stopwords is not None:
+            self.stopwords = dict.fromkeys(stopwords, True)
+            self._stopWordExpressions = {}
+            self._binaryExpressions = None
+        self.vocabulary = Vocabulary(self._stem, segment.localSize, segment.getVocabulary(self.code))
+
+    def _stem(self, token):
+        return self._getStemmer()(token)
+
+    def _getStemmer(self):
+        if self._stemmer is None:
+            if self._stemmerFactory is not None:
+                self._stemmer = self._stemmerFactory()
+            else:
+                self._stemmer = _identity
+        return self._stemmer
+
+    def isStopWord(self, token):
+        return token.lower() in self.stopwords
+
+    def getBinaryExpressions(self):
+        # The expressions compiled for matching bytes in an ASCII compatible encoding instead of text, so that bytes input
+        # doesn't have to be decoded. Returns None if the pack has non-ASCII characters or stopwords, those can only match text
+        if self._binaryExpressions is None:
+            self._binaryExpressions = False
+            if _isAscii(''.join(self._patterns.values())) and all(_isAscii(term) for term in self.stopwords):
+                self._binaryExpressions = BinaryExpressions(self._patterns)
+        return self._binaryExpressions or None
+
+    def getStopWordExpression(self, boundary, shortNumbersExpression=None, binary=False):
+        # Compiling the blacklist is expensive, so the expression is built once per pack and configuration
+        key = (boundary, shortNumbersExpression, binary)
+        if key in self._stopWordExpressions:
+            return self._stopWordExpressions[key]
+
+        blacklistExpression = boundary
+
+        # Adding all blacklist terms
+        for term in self.stopwords:
+            blacklistExpression += '|' + term
+
+        import re
+        if shortNumbersExpression is not None:
+            pattern = '\\s((' + shortNumbersExpression + '|' + blacklistExpression + ')\\s)+'
+        else:
+            pattern = '\\s((' + blacklistExpression + ')\\s)+'
+        if binary:
+            pattern = pattern.encode('ascii')
+        expression = re.compile(pattern)
+        self._stopWordExpressions[key] = expression
+        return expression
+
+
+class BinaryExpressions:
+    """
+       The expressions of a language pack compiled for bytes. As long as all of the
+       pack's characters are ASCII these match in ASCII bytes what the text
+       expressions match in the decoded text. Other bytes don't: a character may take
+       several of them and \b doesn't see them as word characters, so bytes that
+       aren't all ASCII have to be decoded before they are matched (see isAscii).
+    """
+    def __init__(self, patterns):
+        import re
+
+        self.nonAsciiExpression = re.compile(b'[\x80-\xff]')
+        self.whitespaceExpression = re.compile(patterns['whitespace'].encode('ascii'))
+        self.capitalizedNGramExpression = re.compile(patterns['capitalizedNGram'].encode('ascii'))
+        self.specialTermsExpression = re.compile(patterns['specialTerms'].encode('ascii'))
+        self.boundaryExpression = re.compile(patterns['boundary'].encode('ascii'))
+
+    def isAscii(self, data):
+        return self.nonAsciiExpression.search(data) is None
+
+
+def _isAscii(value):
+    try:
+        value.encode('ascii')
+    except UnicodeError:
+        return False
+    return True
+
+
+def _identity(token):
+    return token
+
+
+def get_language_pack(code=None):
+    if code is None:
+        code = DEFAULT_LANGUAGE
+    if code in _LANGUAGE_PACKS:
+        return _LANGUAGE_PACKS[code]
+    if code not in LANGUAGE_MODULES:
+        raise ValueError('Unsupported language: %s' % code)
+
+    pack = LanguagePack(code, importlib.import_module(LANGUAGE_MODULES[code]))
+    if _RESOURCE_SEGMENT is not None:
+        pack.useResourceSegment(_RESOURCE_SEGMENT)
+    _LANGUAGE_PACKS[code] = pack
+    return pack
+
+
+def get_stopwords(code=None):
+    # The stopwords of a language, without loading its pack (and compiling its expressions) if it isn't loaded yet
+    if code is None:
+        code = DEFAULT_LANGUAGE
+    if code in _LANGUAGE_PACKS:
+        return _LANGUAGE_PACKS[code].stopwords
+    if code not in LANGUAGE_MODULES:
+        raise ValueError('Unsupported language: %s' % code)
+    if _RESOURCE_SEGMENT is not None:
+        stopwords = _RESOURCE_SEGMENT.getStopwords(code)
+        if stopwords is not None:
+            return stopwords
+    return importlib.import_module(LANGUAGE_MODULES[code]).STOPWORDS
+
+
+def set_resource_segment(segment):
+    # Has the loaded packs, and the packs loaded from now on, use a resource segment
+    global _RESOURCE_SEGMENT
+    _RESOURCE_SEGMENT = segment
+    for pack in _LANGUAGE_PACKS.values():
+        pack.useResourceSegment(segment)
+
+
+def get_resource_segment():
+    return _RESOURCE_SEGMENT
+
+
+def register_language_pack(code, moduleName):
+    # Registering (or replacing) a language, the module is not imported until the pack is first used
+    LANGUAGE_MODULES[code] = moduleName
+    _LANGUAGE_PACKS.pop(code, None)
+
+
+def loaded_languages():
+    return list(_LANGUAGE_PACKS.keys())
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+       German language pack
+
+       No stemmer is available for this language, terms are matched on their lowercased form.
+
+"""
+UPPERCASE_CHARACTERS = u'A-Z\u00c0-\u00d6\u00d8-\u00de'
+LOWERCASE_CHARACTERS = u'a-z\u00df-\u00f6\u00f8-\u00ff'
+# Lowercase word allowed inside a capitalised compound term
+NGRAM_CONNECTOR = u'von '
+
+STOPWORDS = { u'aber':True,u'alle':True,u'allem':True,u'allen':True,u'aller':True,u'alles':True,u'als':True,u'also':True,u'am':True,u'an':True,u'ander':True,
+        u'andere':True,u'anderem':True,u'anderen':True,u'anderer':True,u'anderes':True,u'anderm':True,u'andern':True,u'anderr':True,u'anders':True,
+        u'auch':True,u'auf':True,u'aus':True,u'bei':True,u'bin':True,u'bis':True,u'bist':True,u'da':True,u'damit':True,u'dann':True,u'das':True,u'dass':True,
+        u'dasselbe':True,u'dazu':True,u'daß':True,u'dein':True,u'deine':True,u'deinem':True,u'deinen':True,u'deiner':True,u'deines':True,u'dem':True,
+        u'demselben':True,u'den':True,u'denn':True,u'denselben':True,u'der':True,u'derer':True,u'derselbe':True,u'derselben':True,u'des':True,
+        u'desselben':True,u'dessen':True,u'dich':True,u'die':True,u'dies':True,u'diese':True,u'dieselbe':True,u'dieselben':True,u'diesem':True,u'diesen':True,
+        u'dieser':True,u'dieses':True,u'dir':True,u'doch':True,u'dort':True,u'du':True,u'durch':True,u'ein':True,u'eine':True,u'einem':True,u'einen':True,
+        u'einer':True,u'eines':True,u'einig':True,u'einige':True,u'einigem':True,u'einigen':True,u'einiger':True,u'einiges':True,u'einmal':True,u'er':True,
+        u'es':True,u'etwas':True,u'euch':True,u'euer':True,u'eure':True,u'eurem':True,u'euren':True,u'eurer':True,u'eures':True,u'für':True,u'gegen':True,
+        u'gewesen':True,u'hab':True,u'habe':True,u'haben':True,u'hat':True,u'hatte':True,u'hatten':True,u'hier':True,u'hin':True,u'hinter':True,u'ich':True,
+        u'ihm':True,u'ihn':True,u'ihnen':True,u'ihr':True,u'ihre':True,u'ihrem':True,u'ihren':True,u'ihrer':True,u'ihres':True,u'im':True,u'in':True,
+        u'indem':True,u'ins':True,u'ist':True,u'jede':True,u'jedem':True,u'jeden':True,u'jeder':True,u'jedes':True,u'jene':True,u'jenem':True,u'jenen':True,
+        u'jener':True,u'jenes':True,u'jetzt':True,u'kann':True,u'kein':True,u'keine':True,u'keinem':True,u'keinen':True,u'keiner':True,u'keines':True,
+        u'können':True,u'könnte':True,u'machen':True,u'man':True,u'manche':True,u'manchem':True,u'manchen':True,u'mancher':True,u'manches':True,u'mein':True,
+        u'meine':True,u'meinem':True,u'meinen':True,u'meiner':True,u'meines':True,u'mich':True,u'mir':True,u'mit':True,u'muss':True,u'musste':True,
+        u'nach':True,u'nicht':True,u'nichts':True,u'noch':True,u'nun':True,u'nur':True,u'ob':True,u'oder':True,u'ohne':True,u'sehr':True,u'sein':True,
+        u'seine':True,u'seinem':True,u'seinen':True,u'seiner':True,u'seines':True,u'selbst':True,u'sich':True,u'sie':True,u'sind':True,u'so':True,
+        u'solche':True,u'solchem':True,u'solchen':True,u'solcher':True,u'solches':True,u'soll':True,u'sollte':True,u'sondern':True,u'sonst':True,u'um':True,
+        u'und':True,u'uns':True,u'unser':True,u'unsere':True,u'unserem':True,u'unseren':True,u'unserer':True,u'unseres':True,u'unter':True,u'viel':True,
+        u'vom':True,u'von':True,u'vor':True,u'war':True,u'waren':True,u'warst':True,u'was':True,u'weg':True,u'weil':True,u'weiter':True,u'welche':True,
+        u'welchem':True,u'welchen':True,u'welcher':True,u'welches':True,u'wenn':True,u'werde':True,u'werden':True,u'wie':True,u'wieder':True,u'will':True,
+        u'wir':True,u'wird':True,u'wirst':True,u'wo':True,u'wollen':True,u'wollte':True,u'während':True,u'würde':True,u'würden':True,u'zu':True,u'zum':True,
+        u'zur':True,u'zwar':True,u'zwischen':True,u'über':True }
@@ -0,0 +1,17 @@
+"""
+       English language pack
+
+"""
+from autotagger.stop_words import STOPWORDS
+
+UPPERCASE_CHARACTERS = 'A-Z'
+LOWERCASE_CHARACTERS = 'a-z'
+# Lowercase word allowed inside a capitalised compound term (e.g. 'Bank of England')
+NGRAM_CONNECTOR = 'of '
+# Surname prefixes that are followed by a capital (e.g. McKinley, MacArthur)
+NAME_PREFIX = 'Mc|Mac'
+
+
+def get_stemmer():
+    from autotagger.stemmer import PorterStemmer
+    return PorterStemmer().stem_word
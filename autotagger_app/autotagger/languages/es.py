@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+       Spanish language pack
+
+       No stemmer is available for this language, terms are matched on their lowercased form.
+
+"""
+UPPERCASE_CHARACTERS = u'A-Z\u00c0-\u00d6\u00d8-\u00de'
+LOWERCASE_CHARACTERS = u'a-z\u00df-\u00f6\u00f8-\u00ff'
+# Lowercase word allowed inside a capitalised compound term
+NGRAM_CONNECTOR = u'de '
+
+STOPWORDS = { u'a':True,u'al':True,u'algo':True,u'algunas':True,u'algunos':True,u'ante':True,u'antes':True,u'como':True,u'con':True,u'contra':True,u'cual':True,
+        u'cuando':True,u'de':True,u'del':True,u'desde':True,u'donde':True,u'durante':True,u'e':True,u'el':True,u'ella':True,u'ellas':True,u'ellos':True,
+        u'en':True,u'entre':True,u'era':True,u'erais':True,u'eran':True,u'eras':True,u'eres':True,u'es':True,u'esa':True,u'esas':True,u'ese':True,u'eso':True,
+        u'esos':True,u'esta':True,u'estaba':True,u'estado':True,u'estamos':True,u'estan':True,u'estar':True,u'estas':True,u'este':True,u'esto':True,
+        u'estos':True,u'estoy':True,u'está':True,u'están':True,u'fue':True,u'fueron':True,u'fui':True,u'fuimos':True,u'ha':True,u'haber':True,u'habia':True,
+        u'han':True,u'has':True,u'hasta':True,u'hay':True,u'la':True,u'las':True,u'le':True,u'les':True,u'lo':True,u'los':True,u'mas':True,u'me':True,
+        u'mi':True,u'mis':True,u'mucho':True,u'muchos':True,u'muy':True,u'más':True,u'mí':True,u'nada':True,u'ni':True,u'no':True,u'nos':True,
+        u'nosotras':True,u'nosotros':True,u'nuestra':True,u'nuestras':True,u'nuestro':True,u'nuestros':True,u'o':True,u'os':True,u'otra':True,u'otras':True,
+        u'otro':True,u'otros':True,u'para':True,u'pero':True,u'poco':True,u'por':True,u'porque':True,u'que':True,u'quien':True,u'quienes':True,u'qué':True,
+        u'se':True,u'sea':True,u'sean':True,u'ser':True,u'si':True,u'sido':True,u'siempre':True,u'sin':True,u'sobre':True,u'sois':True,u'somos':True,
+        u'son':True,u'soy':True,u'su':True,u'sus':True,u'también':True,u'tanto':True,u'te':True,u'tenemos':True,u'tener':True,u'tengo':True,u'ti':True,
+        u'tiene':True,u'tienen':True,u'todo':True,u'todos':True,u'tu':True,u'tus':True,u'tú':True,u'un':True,u'una':True,u'uno':True,u'unos':True,
+        u'vosotras':True,u'vosotros':True,u'vuestra':True,u'vuestras':True,u'vuestro':True,u'vuestros':True,u'y':True,u'ya':True,u'yo':True,u'él':True,
+        u'éramos':True }
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+       French language pack
+
+       No stemmer is available for this language, terms are matched on their lowercased form.
+
+"""
+UPPERCASE_CHARACTERS = u'A-Z\u00c0-\u00d6\u00d8-\u00de'
+LOWERCASE_CHARACTERS = u'a-z\u00df-\u00f6\u00f8-\u00ff'
+# Lowercase word allowed inside a capitalised compound term
+NGRAM_CONNECTOR = u'de '
+
+STOPWORDS = { u'a':True,u'ai':True,u'aie':True,u'aient':True,u'aies':True,u'ait':True,u'alors':True,u'as':True,u'au':True,u'aucun':True,u'aura':True,u'aurai':True,
+        u'auraient':True,u'aurais':True,u'aurait':True,u'aurez':True,u'auriez':True,u'aurions':True,u'aurons':True,u'auront':True,u'aussi':True,u'autre':True,
+        u'aux':True,u'avaient':True,u'avais':True,u'avait':True,u'avec':True,u'avez':True,u'aviez':True,u'avions':True,u'avoir':True,u'avons':True,
+        u'ayant':True,u'ayez':True,u'ayons':True,u'bon':True,u'c':True,u'ce':True,u'ceci':True,u'cela':True,u'celà':True,u'ces':True,u'cet':True,
+        u'cette':True,u'ceux':True,u'chaque':True,u'ci':True,u'comme':True,u'comment':True,u'd':True,u'dans':True,u'de':True,u'des':True,u'deux':True,
+        u'devrait':True,u'doit':True,u'donc':True,u'dos':True,u'du':True,u'elle':True,u'elles':True,u'en':True,u'encore':True,u'es':True,u'est':True,
+        u'et':True,u'eu':True,u'eue':True,u'eues':True,u'eurent':True,u'eus':True,u'eusse':True,u'eussent':True,u'eut':True,u'eux':True,u'fait':True,
+        u'faites':True,u'fois':True,u'font':True,u'furent':True,u'fus':True,u'fut':True,u'ici':True,u'il':True,u'ils':True,u'j':True,u'je':True,u'l':True,
+        u'la':True,u'le':True,u'les':True,u'leur':True,u'leurs':True,u'lui':True,u'm':True,u'ma':True,u'mais':True,u'me':True,u'mes':True,u'moi':True,
+        u'mon':True,u'même':True,u'n':True,u'ne':True,u'ni':True,u'nos':True,u'notre':True,u'nous':True,u'on':True,u'ont':True,u'ou':True,u'où':True,
+        u'par':True,u'parce':True,u'pas':True,u'peu':True,u'peut':True,u'plupart':True,u'pour':True,u'pourquoi':True,u'qu':True,u'quand':True,u'que':True,
+        u'quel':True,u'quelle':True,u'quelles':True,u'quels':True,u'qui':True,u's':True,u'sa':True,u'sans':True,u'se':True,u'sera':True,u'serai':True,
+        u'seraient':True,u'serait':True,u'seront':True,u'ses':True,u'seulement':True,u'si':True,u'sien':True,u'son':True,u'sont':True,u'sous':True,
+        u'soyez':True,u'sujet':True,u'sur':True,u't':True,u'ta':True,u'tandis':True,u'te':True,u'tellement':True,u'tels':True,u'tes':True,u'toi':True,
+        u'ton':True,u'tous':True,u'tout':True,u'toute':True,u'toutes':True,u'très':True,u'tu':True,u'un':True,u'une':True,u'vos':True,u'votre':True,
+        u'vous':True,u'vu':True,u'y':True,u'étaient':True,u'étais':True,u'était':True,u'étant':True,u'étions':True,u'été':True,u'êtes':True,u'être':True }
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+       Italian language pack
+
+       No stemmer is available for this language, terms are matched on their lowercased form.
+
+"""
+UPPERCASE_CHARACTERS = u'A-Z\u00c0-\u00d6\u00d8-\u00de'
+LOWERCASE_CHARACTERS = u'a-z\u00df-\u00f6\u00f8-\u00ff'
+# Lowercase word allowed inside a capitalised compound term
+NGRAM_CONNECTOR = u'di '
+
+STOPWORDS = { u'a':True,u'abbia':True,u'abbiamo':True,u'abbiano':True,u'ad':True,u'agli':True,u'ai':True,u'al':True,u'alla':True,u'alle':True,u'allo':True,
+        u'anche':True,u'avere':True,u'aveva':True,u'avevano':True,u'c':True,u'che':True,u'chi':True,u'ci':True,u'coi':True,u'col':True,u'come':True,
+        u'con':True,u'contro':True,u'cui':True,u'da':True,u'dagli':True,u'dai':True,u'dal':True,u'dalla':True,u'dalle':True,u'dallo':True,u'degli':True,
+        u'dei':True,u'del':True,u'della':True,u'delle':True,u'dello':True,u'di':True,u'dove':True,u'e':True,u'ebbe':True,u'ed':True,u'era':True,u'erano':True,
+        u'essere':True,u'fa':True,u'fino':True,u'fra':True,u'fu':True,u'furono':True,u'gli':True,u'ha':True,u'hai':True,u'hanno':True,u'ho':True,u'i':True,
+        u'il':True,u'in':True,u'io':True,u'la':True,u'le':True,u'lei':True,u'li':True,u'lo':True,u'loro':True,u'lui':True,u'ma':True,u'mi':True,u'mia':True,
+        u'mie':True,u'miei':True,u'mio':True,u'ne':True,u'negli':True,u'nei':True,u'nel':True,u'nella':True,u'nelle':True,u'nello':True,u'noi':True,
+        u'non':True,u'nostra':True,u'nostre':True,u'nostri':True,u'nostro':True,u'o':True,u'per':True,u'perché':True,u'più':True,u'quale':True,u'quanta':True,
+        u'quante':True,u'quanti':True,u'quanto':True,u'quella':True,u'quelle':True,u'quelli':True,u'quello':True,u'questa':True,u'queste':True,u'questi':True,
+        u'questo':True,u'se':True,u'sei':True,u'si':True,u'sia':True,u'siamo':True,u'siano':True,u'sono':True,u'sta':True,u'su':True,u'sua':True,u'sue':True,
+        u'sugli':True,u'sui':True,u'sul':True,u'sulla':True,u'sulle':True,u'sullo':True,u'suo':True,u'suoi':True,u'ti':True,u'tra':True,u'tu':True,
+        u'tua':True,u'tue':True,u'tuo':True,u'tuoi':True,u'tutti':True,u'tutto':True,u'un':True,u'una':True,u'uno':True,u'vi':True,u'voi':True,u'vostra':True,
+        u'vostro':True,u'è':True }
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+       Dutch language pack
+
+       No stemmer is available for this language, terms are matched on their lowercased form.
+
+"""
+UPPERCASE_CHARACTERS = u'A-Z\u00c0-\u00d6\u00d8-\u00de'
+LOWERCASE_CHARACTERS = u'a-z\u00df-\u00f6\u00f8-\u00ff'
+# Lowercase word allowed inside a capitalised compound term
+NGRAM_CONNECTOR = u'van '
+
+STOPWORDS = { u'aan':True,u'al':True,u'alles':True,u'als':True,u'altijd':True,u'andere':True,u'ben':True,u'bij':True,u'daar':True,u'dan':True,u'dat':True,
+        u'de':True,u'der':True,u'deze':True,u'die':True,u'dit':True,u'doch':True,u'doen':True,u'door':True,u'dus':True,u'een':True,u'eens':True,u'en':True,
+        u'er':True,u'ge':True,u'geen':True,u'geweest':True,u'haar':True,u'had':True,u'heb':True,u'hebben':True,u'heeft':True,u'hem':True,u'het':True,
+        u'hier':True,u'hij':True,u'hoe':True,u'hun':True,u'iemand':True,u'iets':True,u'ik':True,u'in':True,u'is':True,u'ja':True,u'je':True,u'kan':True,
+        u'kon':True,u'kunnen':True,u'maar':True,u'me':True,u'meer':True,u'men':True,u'met':True,u'mij':True,u'mijn':True,u'moet':True,u'na':True,u'naar':True,
+        u'niet':True,u'niets':True,u'nog':True,u'nu':True,u'of':True,u'om':True,u'omdat':True,u'onder':True,u'ons':True,u'ook':True,u'op':True,u'over':True,
+        u'reeds':True,u'te':True,u'tegen':True,u'toch':True,u'toen':True,u'tot':True,u'u':True,u'uit':True,u'uw':True,u'van':True,u'veel':True,u'voor':True,
+        u'want':True,u'waren':True,u'was':True,u'wat':True,u'werd':True,u'wezen':True,u'wie':True,u'wil':True,u'worden':True,u'wordt':True,u'zal':True,
+        u'ze':True,u'zelf':True,u'zich':True,u'zij':True,u'zijn':True,u'zo':True,u'zonder':True,u'zou':True }
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""
+       Portuguese language pack
+
+       No stemmer is available for this language, terms are matched on their lowercased form.
+
+"""
+UPPERCASE_CHARACTERS = u'A-Z\u00c0-\u00d6\u00d8-\u00de'
+LOWERCASE_CHARACTERS = u'a-z\u00df-\u00f6\u00f8-\u00ff'
+# Lowercase word allowed inside a capitalised compound term
+NGRAM_CONNECTOR = u'de '
+
+STOPWORDS = { u'a':True,u'ao':True,u'aos':True,u'aquela':True,u'aquelas':True,u'aquele':True,u'aqueles':True,u'aquilo':True,u'as':True,u'até':True,u'com':True,
+        u'como':True,u'da':True,u'das':True,u'de':True,u'dela':True,u'delas':True,u'dele':True,u'deles':True,u'depois':True,u'do':True,u'dos':True,u'e':True,
+        u'ela':True,u'elas':True,u'ele':True,u'eles':True,u'em':True,u'entre':True,u'era':True,u'eram':True,u'essa':True,u'essas':True,u'esse':True,
+        u'esses':True,u'esta':True,u'estas':True,u'este':True,u'estes':True,u'eu':True,u'foi':True,u'foram':True,u'há':True,u'isso':True,u'isto':True,
+        u'já':True,u'lhe':True,u'lhes':True,u'mais':True,u'mas':True,u'me':True,u'mesmo':True,u'meu':True,u'meus':True,u'minha':True,u'minhas':True,
+        u'muito':True,u'na':True,u'nas':True,u'nem':True,u'no':True,u'nos':True,u'nossa':True,u'nossas':True,u'nosso':True,u'nossos':True,u'num':True,
+        u'numa':True,u'não':True,u'o':True,u'os':True,u'ou':True,u'para':True,u'pela':True,u'pelas':True,u'pelo':True,u'pelos':True,u'por':True,u'qual':True,
+        u'quando':True,u'que':True,u'quem':True,u'se':True,u'sem':True,u'ser':True,u'seu':True,u'seus':True,u'sua':True,u'suas':True,u'são':True,
+        u'também':True,u'te':True,u'tem':True,u'tinha':True,u'to':True,u'tu':True,u'tua':True,u'tuas':True,u'um':True,u'uma':True,u'você':True,u'vocês':True,
+        u'vos':True,u'à':True,u'às':True,u'é':True }
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""
+       Swedish language pack
+
+       No stemmer is available for this language, terms are matched on their lowercased form.
+
+"""
+UPPERCASE_CHARACTERS = u'A-Z\u00c0-\u00d6\u00d8-\u00de'
+LOWERCASE_CHARACTERS = u'a-z\u00df-\u00f6\u00f8-\u00ff'
+# Lowercase word allowed inside a capitalised compound term
+NGRAM_CONNECTOR = u'av '
+
+STOPWORDS = { u'alla':True,u'allt':True,u'att':True,u'av':True,u'blev':True,u'bli':True,u'blir':True,u'blivit':True,u'de':True,u'dem':True,u'den':True,
+        u'denna':True,u'deras':True,u'dess':True,u'dessa':True,u'det':True,u'detta':True,u'dig':True,u'din':True,u'dina':True,u'ditt':True,u'du':True,
+        u'där':True,u'då':True,u'efter':True,u'ej':True,u'eller':True,u'en':True,u'er':True,u'era':True,u'ert':True,u'ett':True,u'från':True,u'för':True,
+        u'ha':True,u'hade':True,u'han':True,u'hans':True,u'har':True,u'henne':True,u'hennes':True,u'hon':True,u'honom':True,u'hur':True,u'här':True,u'i':True,
+        u'icke':True,u'ingen':True,u'inom':True,u'inte':True,u'jag':True,u'ju':True,u'kan':True,u'kunde':True,u'man':True,u'med':True,u'mellan':True,
+        u'men':True,u'mig':True,u'min':True,u'mina':True,u'mitt':True,u'mot':True,u'mycket':True,u'ni':True,u'nu':True,u'när':True,u'någon':True,
+        u'något':True,u'några':True,u'och':True,u'om':True,u'oss':True,u'på':True,u'samma':True,u'sedan':True,u'sig':True,u'sin':True,u'sina':True,
+        u'sitta':True,u'själv':True,u'skulle':True,u'som':True,u'så':True,u'sådan':True,u'sådana':True,u'sådant':True,u'till':True,u'under':True,u'upp':True,
+        u'ut':True,u'utan':True,u'vad':True,u'var':True,u'vara':True,u'varför':True,u'varit':True,u'varje':True,u'vars':True,u'vem':True,u'vi':True,
+        u'vid':True,u'vilka':True,u'vilkas':True,u'vilken':True,u'vilket':True,u'vår':True,u'våra':True,u'vårt':True,u'än':True,u'är':True,u'åt':True,
+        u'över':True }
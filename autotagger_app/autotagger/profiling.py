@@ -0,0 +1,232 @@
+"""
+       Sampling Profiler
+
+       Profiles a fraction of the Tagger's calls in production (see
+       Tagger.PROFILE_SAMPLE_RATE). A profiled call records the wall time of every
+       pipeline stage from the marks the Tagger sets as it goes (reading, preprocess,
+       stopword regex, single terms, special terms, capitalised n-grams, bigrams, 2nd
+       pass, 3rd pass), and a background thread samples its Python stack every few
+       milliseconds. Samples inside the PorterStemmer are counted as a stage of their
+       own. The stacks are exported as collapsed stacks, the input format of
+       flamegraph.pl, speedscope and inferno, with the stage as the root frame.
+       Texts that take longer than a threshold are kept in a slow-document log with
+       their size and, if they were profiled, their stage times.
+
+       Regular expressions run in C and hold the GIL, so their time shows in the
+       stage times but their stack samples are only taken once they return.
+
+"""
+import collections
+import datetime
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+import timeit
+
+from autotagger.tagger import TEXT_TYPES
+
+STEMMER_STAGE = 'stemmer'
+
+_PREFIX_LENGTH = 65536 # Slow documents are identified by a hash of (at most) this many characters or bytes at their start
+
+_profiler = None
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.002, slowDocumentSeconds=1.0, maxSlowDocuments=100, seed=None ):
+        self.interval = interval # Seconds between stack samples of a profiled call
+        self.slowDocumentSeconds = slowDocumentSeconds
+        self.calls = 0
+        self.profiledCalls = 0
+        # Stage -> seconds, over all profiled calls
+        self.stageTimes = {}
+        # Collapsed stack -> samples
+        self.stacks = {}
+        self.slowDocuments = collections.deque( maxlen=maxSlowDocuments )
+        self._random = random.Random( seed )
+        # Thread id -> profile of the call it is running, the sampler thread only runs while there are any
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wakeUp = threading.Event()
+        self._thread = None
+        self._labels = {}
+
+    def start(self, text, rate ):
+        # Times a call, and profiles it with the given probability
+        profile = _Profile( text, self._random.random() < rate )
+        if profile.sampled:
+            with self._lock:
+                self._active[profile.threadId] = profile
+                if self._thread is None:
+                    self._thread = threading.Thread( target=self._sample, name='autotagger-profiler' )
+                    self._thread.daemon = True
+                    self._thread.start()
+                self._wakeUp.set()
+        return profile
+
+    def stop(self, profile, tagSet=None ):
+        profile.mark( None )
+        seconds = timeit.default_timer() - profile.startTime
+        stageTimes = None
+        with self._lock:
+            self.calls += 1
+            if profile.sampled:
+                del self._active[profile.threadId]
+                if not self._active:
+                    self._wakeUp.clear()
+                self.profiledCalls += 1
+                stageTimes = self._addSamples( profile )
+        if seconds >= self.slowDocumentSeconds:
+            # Described outside the lock, this reads the whole text
+            record = self._describe( profile, seconds, tagSet, stageTimes )
+            with self._lock:
+                self.slowDocuments.append( record )
+
+    def getStageTimes(self):
+        # (stage, seconds, share of the profiled time), slowest first
+        with self._lock:
+            total = sum(self.stageTimes.values()) or 1.0
+            return [ (stage, seconds, seconds / total) for stage, seconds in sorted(self.stageTimes.items(), key=lambda item: -item[1]) ]
+
+    def writeCollapsedStacks(self, path ):
+        with self._lock:
+            lines = [ '%s %d\n' % (stack, count) for stack, count in sorted(self.stacks.items()) ]
+        with open( path, 'w' ) as stream:
+            stream.writelines( lines )
+
+    def writeSlowDocuments(self, path ):
+        with self._lock:
+            records = list( self.slowDocuments )
+        with open( path, 'w' ) as stream:
+            for record in records:
+                stream.write( json.dumps( record, sort_keys=True ) + '\n' )
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.profiledCalls = 0
+            self.stageTimes = {}
+            self.stacks = {}
+            self.slowDocuments.clear()
+
+    def _sample(self):
+        while True:
+            self._wakeUp.wait()
+            time.sleep( self.interval )
+            frames = sys._current_frames()
+            with self._lock:
+                if not self._active:
+                    self._wakeUp.clear()
+                    continue
+                for threadId, profile in self._active.items():
+                    frame = frames.get( threadId )
+                    if frame is not None:
+                        profile.addSample( frame )
+            frames = None
+
+    def _addSamples(self, profile ):
+        # Adds the samples and stage times of a profiled call to the totals, the share of a stage's samples that were
+        # in the stemmer is moved to the stemmer stage
+        stageTimes = dict( profile.stageTimes )
+        stageSamples = {}
+        stemmerSamples = {}
+        for (stage, codes), count in profile.samples.items():
+            stageSamples[stage] = stageSamples.get(stage, 0) + count
+            labels = [ self._getLabel( code ) for code in reversed(codes) ]
+            if any( _isStemmer( code ) for code in codes ):
+                stemmerSamples[stage] = stemmerSamples.get(stage, 0) + count
+                stage = STEMMER_STAGE
+            stack = ';'.join( [ '[%s]' % stage ] + labels )
+            self.stacks[stack] = self.stacks.get(stack, 0) + count
+        for stage, count in stemmerSamples.items():
+            if stage in stageTimes:
+                seconds = stageTimes[stage] * count / stageSamples[stage]
+                stageTimes[stage] -= seconds
+                stageTimes[STEMMER_STAGE] = stageTimes.get(STEMMER_STAGE, 0.0) + seconds
+        for stage, seconds in stageTimes.items():
+            self.stageTimes[stage] = self.stageTimes.get(stage, 0.0) + seconds
+        return stageTimes
+
+    def _getLabel(self, code ):
+        label = self._labels.get( code )
+        if label is None:
+            label = self._labels[code] = '%s (%s)' % ( code.co_name, os.path.basename( code.co_filename ) )
+        return label
+
+    def _describe(self, profile, seconds, tagSet, stageTimes ):
+        text = profile.text
+        record = {
+                'time' : datetime.datetime.now().isoformat(),
+                'seconds' : seconds,
+                'size' : len(text),
+                'binary' : profile.binary,
+                'prefixHash' : _hashPrefix( text ),
+                'profiled' : profile.sampled
+        }
+        if hasattr( text, 'count' ):
+            # Few spaces per character point at minified code, encoded blobs and other pathological input
+            newline, space = ( b'\n', b' ' ) if profile.binary else ( '\n', ' ' )
+            record['lines'] = text.count( newline ) + 1
+            record['spaces'] = text.count( space )
+        if tagSet is not None:
+            record['language'] = tagSet.language
+            record['approximations'] = tagSet.approximations
+        if stageTimes is not None:
+            record['stages'] = stageTimes
+        return record
+
+
+class _Profile:
+    # The timing (and when sampled, the stage times and stack samples) of one call
+    def __init__(self, text, sampled ):
+        self.text = text
+        self.binary = not isinstance( text, TEXT_TYPES )
+        self.sampled = sampled
+        self.threadId = threading.current_thread().ident
+        self.startTime = timeit.default_timer()
+        self.stage = None
+        self.stageTimes = {}
+        # (stage, code objects from the innermost frame out) -> samples
+        self.samples = {}
+        self._stageStart = self.startTime
+
+    def mark(self, stage ):
+        # The call moves on to another stage
+        now = timeit.default_timer()
+        if self.stage is not None:
+            self.stageTimes[self.stage] = self.stageTimes.get(self.stage, 0.0) + now - self._stageStart
+        self.stage = stage
+        self._stageStart = now
+
+    def addSample(self, frame ):
+        codes = []
+        while frame is not None:
+            codes.append( frame.f_code )
+            frame = frame.f_back
+        key = ( self.stage, tuple(codes) )
+        self.samples[key] = self.samples.get(key, 0) + 1
+
+
+def get_profiler():
+    # The profiler shared by all taggers that don't have their own
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler()
+    return _profiler
+
+
+def _isStemmer(code ):
+    return os.path.splitext( os.path.basename( code.co_filename ) )[0] == 'stemmer'
+
+
+def _hashPrefix(text ):
+    prefix = text[:_PREFIX_LENGTH]
+    if isinstance( prefix, memoryview ):
+        prefix = prefix.tobytes()
+    elif not isinstance( prefix, (bytes, bytearray) ):
+        prefix = prefix.encode('utf-8')
+    return hashlib.md5( prefix ).hexdigest()
@@ -0,0 +1,263 @@
+"""
+       Shared Resource Segment
+
+       Builds the read-only resources of the tagger (the stopwords of every language,
+       the whitelist and a vocabulary of stemmed term ids per language) once into a
+       file, which worker processes map into memory and look things up in as it is,
+       without reading it into dictionaries. The pages of the file are shared by all
+       processes that map it, so N workers hold one copy of the resources plus what
+       each of them adds to its own vocabulary (bounded by the attach size).
+
+       build_segment('resources.seg', { 'en' : texts })  # once, e.g. at deploy time
+       attach('resources.seg')                            # in every worker, before tagging
+
+       The lookups go through open-addressing hash tables (linear probing on the CRC32
+       of the UTF-8 key), so no Python objects are made for the entries of the file.
+
+"""
+import mmap
+import struct
+import zlib
+
+from autotagger.vocabulary import Vocabulary
+
+SEGMENT_MAGIC = b'ATRS2'
+
+DEFAULT_LOCAL_SIZE = 50000 # Entries a worker's own vocabulary holds on top of the shared one before it is reset
+
+# Tables are at least twice as large as their entries, so the probe sequences stay short
+_LOAD_FACTOR = 2
+
+_UINT16 = struct.Struct('<H')
+_UINT32 = struct.Struct('<I')
+_SLOT = struct.Struct('<II') # (hash, record offset), offset 0 is an empty slot
+_TABLE_HEADER = struct.Struct('<III') # (slots, entries, end of the records)
+
+
+class ResourceSegment:
+    def __init__(self, path ):
+        with open( path, 'rb' ) as stream:
+            self._buffer = mmap.mmap( stream.fileno(), 0, access=mmap.ACCESS_READ )
+        if self._buffer[:len(SEGMENT_MAGIC)] != SEGMENT_MAGIC:
+            raise ValueError('Not a resource segment: %s' % path)
+        self.path = path
+        self.localSize = DEFAULT_LOCAL_SIZE
+        # Table name -> offset, from the directory at the start of the file
+        self._tables = {}
+        offset = len(SEGMENT_MAGIC)
+        count, = _UINT32.unpack_from( self._buffer, offset )
+        offset += 4
+        for i in range(count):
+            length, = _UINT16.unpack_from( self._buffer, offset )
+            name = self._buffer[offset + 2:offset + 2 + length].decode('utf-8')
+            self._tables[name], = _UINT32.unpack_from( self._buffer, offset + 2 + length )
+            offset += 6 + length
+        self.whitelist = self.getSet('whitelist')
+
+    def getSet(self, name ):
+        if name not in self._tables:
+            return None
+        return SharedSet( self._buffer, self._tables[name] )
+
+    def getStopwords(self, language ):
+        return self.getSet('stopwords/' + language)
+
+    def getVocabulary(self, language ):
+        if 'ids/' + language not in self._tables:
+            return None
+        return SharedVocabulary( self._buffer, self._tables['ids/' + language], self._tables['tokens/' + language],
+                self._tables['strings/' + language] )
+
+    def getTableNames(self):
+        return sorted(self._tables)
+
+    def close(self):
+        self._buffer.close()
+
+
+class SharedSet:
+    # A set of strings in a segment, or a map of strings to integers (see get)
+    def __init__(self, buffer, offset ):
+        self._buffer = buffer
+        self._slotCount, self._count, self._end = _TABLE_HEADER.unpack_from( buffer, offset )
+        self._mask = self._slotCount - 1
+        self._slots = offset + _TABLE_HEADER.size
+        self._records = self._slots + self._slotCount * _SLOT.size
+
+    def get(self, key, default=None ):
+        data = _encode( key )
+        buffer = self._buffer
+        hash = zlib.crc32( data ) & 0xffffffff
+        slot = hash & self._mask
+        while True:
+            slotHash, offset = _SLOT.unpack_from( buffer, self._slots + slot * _SLOT.size )
+            if offset == 0:
+                return default
+            if slotHash == hash:
+                length, = _UINT32.unpack_from( buffer, offset )
+                if buffer[offset + 4:offset + 4 + length] == data:
+                    return _UINT32.unpack_from( buffer, offset + 4 + length )[0]
+            slot = (slot + 1) & self._mask
+
+    def __contains__(self, key ):
+        return self.get( key ) is not None
+
+    def __iter__(self):
+        # The keys in the order they were added
+        buffer = self._buffer
+        offset = self._records
+        while offset < self._end:
+            length, = _UINT32.unpack_from( buffer, offset )
+            yield buffer[offset + 4:offset + 4 + length].decode('utf-8')
+            offset += 8 + length
+
+    def __len__(self):
+        return self._count
+
+
+class SharedVocabulary:
+    # The read-only base of the language pack vocabularies (see Vocabulary), ids are the same in every process
+    def __init__(self, buffer, idsOffset, tokensOffset, stringsOffset ):
+        self._ids = SharedSet( buffer, idsOffset )
+        self._tokenIds = SharedSet( buffer, tokensOffset )
+        self._buffer = buffer
+        self._strings = stringsOffset + 4
+        self._count, = _UINT32.unpack_from( buffer, stringsOffset )
+
+    def getId(self, termId ):
+        return self._ids.get( termId )
+
+    def getTokenId(self, token ):
+        return self._tokenIds.get( token )
+
+    def getString(self, id ):
+        offset, = _UINT32.unpack_from( self._buffer, self._strings + id * 4 )
+        length, = _UINT32.unpack_from( self._buffer, offset )
+        return self._buffer[offset + 4:offset + 4 + length].decode('utf-8')
+
+    def __len__(self):
+        return self._count
+
+
+def build_segment(path, corpus=None, languages=None ):
+    # Writes the stopwords of the given (or all) languages, the whitelist, and for each language in the corpus
+    # (language -> texts) the vocabulary of the terms found in its texts
+    from autotagger.languages import LANGUAGE_MODULES, get_language_pack
+    from autotagger.tagger import Tagger, _getWhitelist
+
+    corpus = corpus or {}
+    if languages is None:
+        languages = sorted(set(LANGUAGE_MODULES) | set(corpus))
+
+    writer = _SegmentWriter()
+    writer.addSet( 'whitelist', _getWhitelist() )
+    for language in languages:
+        writer.addSet( 'stopwords/' + language, get_language_pack( language ).stopwords )
+
+    tagger = Tagger()
+    for language in sorted(corpus):
+        # Extracting the candidates of the texts into a vocabulary of their own
+        pack = get_language_pack( language )
+        vocabulary = pack.vocabulary
+        pack.vocabulary = Vocabulary( pack._stem, None )
+        try:
+            for text in corpus[language]:
+                tagger.extract_candidates( text, language )
+            writer.addVocabulary( language, pack.vocabulary )
+        finally:
+            pack.vocabulary = vocabulary
+    writer.write( path )
+
+
+def attach(path, localSize=DEFAULT_LOCAL_SIZE ):
+    # Maps a segment and has the language packs of this process (loaded already or later) use it
+    from autotagger.languages import set_resource_segment
+    segment = ResourceSegment( path )
+    segment.localSize = localSize
+    set_resource_segment( segment )
+    return segment
+
+
+class _SegmentWriter:
+    def __init__(self):
+        # (name, function writing the table at an offset), the tables are laid out after the directory
+        self._tables = []
+
+    def addSet(self, name, keys, values=None ):
+        keys = list(keys)
+        self._tables.append( (name, lambda offset: _hashTable( keys, values, offset )) )
+
+    def addVocabulary(self, language, vocabulary ):
+        strings = [ vocabulary.getString( id ) for id in range(len(vocabulary)) ]
+        self.addSet( 'ids/' + language, strings, list(range(len(strings))) )
+        tokens = list( vocabulary._tokenIds.items() )
+        self.addSet( 'tokens/' + language, [ token for token, id in tokens ], [ id for token, id in tokens ] )
+        self._tables.append( ('strings/' + language, lambda offset: _stringArray( strings, offset )) )
+
+    def write(self, path ):
+        directory = [ SEGMENT_MAGIC, _UINT32.pack( len(self._tables) ) ]
+        offset = len(SEGMENT_MAGIC) + 4
+        for name, writeTable in self._tables:
+            offset += 6 + len( _encode( name ) )
+        parts = []
+        for name, writeTable in self._tables:
+            name = _encode( name )
+            directory.append( _UINT16.pack( len(name) ) + name + _UINT32.pack( offset ) )
+            data = writeTable( offset )
+            parts.append( data )
+            offset += len(data)
+        with open( path, 'wb' ) as stream:
+            stream.write( b''.join( directory + parts ) )
+
+
+def _hashTable(keys, values, offset ):
+    # Header, slots and the records (key length, key, value) in the order of the keys
+    entries = []
+    seen = set()
+    for index, key in enumerate(keys):
+        data = _encode( key )
+        if data in seen:
+            continue
+        seen.add( data )
+        entries.append( (data, values[index] if values is not None else 0) )
+    slotCount = 8
+    while slotCount < len(entries) * _LOAD_FACTOR:
+        slotCount *= 2
+    mask = slotCount - 1
+
+    recordOffset = offset + _TABLE_HEADER.size + slotCount * _SLOT.size
+    slots = [ (0, 0) ] * slotCount
+    records = []
+    for data, value in entries:
+        hash = zlib.crc32( data ) & 0xffffffff
+        slot = hash & mask
+        while slots[slot][1] != 0:
+            slot = (slot + 1) & mask
+        slots[slot] = (hash, recordOffset)
+        record = _UINT32.pack( len(data) ) + data + _UINT32.pack( value )
+        records.append( record )
+        recordOffset += len(record)
+
+    parts = [ _TABLE_HEADER.pack( slotCount, len(entries), recordOffset ) ]
+    parts.extend( _SLOT.pack( hash, slotOffset ) for hash, slotOffset in slots )
+    parts.extend( records )
+    return b''.join( parts )
+
+
+def _stringArray(strings, offset ):
+    # The count, the offset of every string and the strings (32-bit length, UTF-8)
+    recordOffset = offset + 4 + 4 * len(strings)
+    offsets = []
+    records = []
+    for string in strings:
+        data = _encode( string )
+        offsets.append( _UINT32.pack( recordOffset ) )
+        records.append( _UINT32.pack( len(data) ) + data )
+        recordOffset += 4 + len(data)
+    return b''.join( [ _UINT32.pack( len(strings) ) ] + offsets + records )
+
+
+def _encode(value ):
+    if isinstance( value, bytes ):
+        return value
+    return value.encode('utf-8')
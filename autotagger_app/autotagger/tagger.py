@@ -1,11 +1,13 @@
-from autotagger.stop_words import STOPWORDS
-from autotagger.stemmer import PorterStemmer
+from autotagger.languages import get_language_pack, get_resource_segment, DEFAULT_LANGUAGE
+import codecs
 import datetime 
-from whitelist import WHITELIST
-from constants import TAG_CONSTANTS
+import heapq
+import struct
+import timeit
+import zlib
+from autotagger.constants import TAG_CONSTANTS
 
 
-import re
 """
        A U T O T A G S
        Automatic tag suggestions or keyword generation for text, using unsupervised
@@ -43,9 +45,22 @@ AUTOTAGS = {
         'VERSION' : 1.2,
         'DEFAULT_COMPOUND_TAG_SEPARATOR' : ' ',
         'APPLY_STEMMING' : True, # If true then the Porter stemmer should be applied to all tokens (but not phrases or n-grams), this has some overhead
-        'BOUNDARY' : '##!##' # Compound terms will not be created across BOUNDARIES
+        'BOUNDARY' : '##!##', # Compound terms will not be created across BOUNDARIES
+        'DEFAULT_LANGUAGE' : DEFAULT_LANGUAGE # Language pack used when none is given to the Tagger
 }
 
+# Entries the whitelist cache of a Tagger holds before it is cleared
+WHITELIST_CACHE_SIZE = 10000
+
+# Longest simple n-grams a Tagger can be asked for (see Tagger.MAX_NGRAM_LENGTH)
+MAX_NGRAM_LENGTH_LIMIT = 4
+
+# Tokens the 1st pass reads between checks that the vocabulary is within its size (see Tagger._boundVocabulary)
+VOCABULARY_CHECK_INTERVAL = 4096
+
+# Serialisation header of FrequencyListSet (the trailing digit is the format version)
+FREQUENCY_LIST_MAGIC = b'ATFL3'
+
 TermConstants = {
         'TYPE_SINGLE_TERM' : 'TYPE_SINGLE_TERM',
         'TYPE_CAPITALISED_COMPOUND_TERM' : 'TYPE_CAPITALISED_COMPOUND_TERM',
@@ -54,9 +69,28 @@ TermConstants = {
         'TYPE_TAG_CONSTANT' : 'TYPE_TAG_CONSTANT'
 }
 
+# Types of text input, any other input (bytes, bytearray, memoryview or mmap) is read as encoded bytes
+try:
+    TEXT_TYPES = (str, unicode)
+except NameError:
+    TEXT_TYPES = (str,)
+
+# Boundary punctuation (see languages.BOUNDARY_EXPRESSION) followed by a space, and whitespace that is a boundary itself.
+# Input cut after one of these splits no candidate, special terms like U.S.A. can span a full stop without a space
+_BOUNDARY_SEPARATORS = ( b'. ', b'! ', b'? ', b': ', b'; ', b'\t', b'\r', b'\f' )
+
+# Encodings in which the ASCII characters are single bytes of the same value, bytes input in these can be matched without decoding it
+ASCII_COMPATIBLE_ENCODINGS = ( 'utf-8', 'ascii', 'iso8859-1', 'cp1252' )
+
+# Term types in the order they are numbered when serialised
+TERM_TYPES = [ TermConstants['TYPE_SINGLE_TERM'], TermConstants['TYPE_CAPITALISED_COMPOUND_TERM'], TermConstants['TYPE_SIMPLE_BIGRAM_TERM'],
+        TermConstants['TYPE_SPECIAL_TERM'], TermConstants['TYPE_TAG_CONSTANT'] ]
+
 class Term:
-    def __init__(self):
-        self._termId = ''
+    def __init__(self, languagePack=None):
+        self.languagePack = languagePack
+        self.vocabulary = None # The language pack's vocabulary, which interned the term id
+        self._termId = None
         self._term = ''
         self.termType = TermConstants['TYPE_SINGLE_TERM']
         self.freq = 1
@@ -87,17 +121,31 @@ class Term:
         self._setTermId()
        
     def getTermId(self):
+        if self._termId == None:
+            return ''
+        return self.vocabulary.getString( self._termId )
+
+    def getId(self):
+        # The interned term id, the frequency lists key on this integer
         return self._termId
 
        
     def _setTermId(self):
+        vocabulary = self._getVocabulary()
         # If this is a single token and stemming should be applied then modify the termID
         if AUTOTAGS['APPLY_STEMMING'] and not self.isCompoundTerm():
-            self._termId = _stemToken( self.getValue() )
+            # The vocabulary stems and lowercases every distinct token only once
+            self._termId = vocabulary.getTokenId( self.getValue() )
         else:
-            self._termId = self.getValue()
-        # Lowercasing the key to the term in the frequency list
-        self._termId = self._termId.lower()
+            # Lowercasing the key to the term in the frequency list
+            self._termId = vocabulary.getId( self.getValue().lower() )
+
+    def _getVocabulary(self):
+        if self.vocabulary == None:
+            if self.languagePack == None:
+                self.languagePack = get_language_pack()
+            self.vocabulary = self.languagePack.vocabulary
+        return self.vocabulary
  
     def getTermType(self):
         return self.termType
@@ -117,16 +165,30 @@ class Term:
     def valueEqualsIgnoreCase(self, term ):
         return self.toString().lower() == term.toString().lower()
 
+    def copy(self):
+        term = Term(self.languagePack)
+        term.vocabulary = self.vocabulary
+        term._termId = self._termId
+        term._term = self._term
+        term.termType = self.termType
+        term.freq = self.freq
+        term.ignoreTermFreqCutoff = self.ignoreTermFreqCutoff
+        term.boost = self.boost
+        return term
+
 class TagSet:
     def __init__(self):
         self.tags =[] #array
         self.TAG_SEPARATOR = ', '
+        self.language = None # Code of the language pack the tags were extracted with
+        self.fingerprint = None # SimHash or MinHash signature of the text, if the Tagger was asked for one
+        self.approximations = [] # Why the tags may differ from a full analysis ('truncated', 'sampled', 'capped', 'split', 'partial'), empty if they don't
         
     def addTag(self, term ):
         self.tags.append( term )
        
     def addAllTags(self, tagArray ):
-        self.tags = self.tags.extend( tagArray )
+        self.tags.extend( tagArray )
        
     def getTags(self):
         return self.tags
@@ -135,13 +197,21 @@ class TagSet:
         if separator != None:
             self.TAG_SEPARATOR = separator
      
-        return self.tags.join( self.TAG_SEPARATOR )
+        return self.TAG_SEPARATOR.join( [ term.getValue() for term in self.tags ] )
        
     def sortByScore(self):
-        self.tags.sort( self._scoreComparator )
+        # Highest score first, the sort is stable so terms with equal scores keep their order
+        self.tags.sort( key=self._scoreKey )
        
-    def _scoreComparator(self, a, b ):
-        return int(b.getScore() - a.getScore())
+    def _scoreKey(self, term ):
+        return -term.getScore()
+
+    def isApproximate(self):
+        return len(self.approximations) > 0
+
+    def isPartial(self):
+        # True if quick_tags ran out of time or stopped early, before analysing the whole text
+        return 'partial' in self.approximations
 
     def toList(self):
         l = []
@@ -169,18 +239,33 @@ class Tagger():
         self.NGRAM_BASED_ON_CAPITALISATION_BOOST = 3.5 # This boost is applied to capitalised bi- and trigrams
         self.SPECIAL_TERM_BOOST = 2.5 # This boost is applied to capitalised bi- and trigrams
         self.BIGRAM_BOOST = 2.5 # This is applied to bigrams that do not contain stopwords and whose individual tokens are longer than 2 characters
+        self.MAX_NGRAM_LENGTH = 2 # Simple n-grams (built like bigrams) of up to this many tokens are candidates, at most MAX_NGRAM_LENGTH_LIMIT
+        self.NGRAM_LENGTH_BOOST = 1.5 # This boost is applied to simple n-grams once per token past two, so that one that makes up most occurrences of the bigrams within it outranks (and downweights) them
         self.BIGRAM_ALREADY_DETECTED_BOOST = 0.25 # This boost is applied to all bigrams found to be wholly contained within a compound term detected based on capitalisation
         self.TERM_FROM_COMPOUND_DOWNWEIGHT = 0.25 # This is applied to individual tokens within an n-gram (every time an n-gram is discovered)
        
         self.COMPOUND_TAG_SEPARATOR = AUTOTAGS['DEFAULT_COMPOUND_TAG_SEPARATOR'] # Intra-tag (e.g. cool_gadget vs. cool gadget) separator to use
+        self.LANGUAGE = AUTOTAGS['DEFAULT_LANGUAGE'] # Language pack (stopwords, stemmer and expressions) used unless another one is given per call
+        self.DETECT_LANGUAGE = False # If true the language of the text is detected when none is given per call
+        self.SKIP_UNDETECTED_LANGUAGE = False # If true (and detecting) texts whose language can't be detected return no tags, otherwise LANGUAGE is used
+        self.FINGERPRINT = None # Set to 'simhash' or 'minhash' to fingerprint the normalised tokens of each text while tagging it
+
+        # Memory budget, both are unlimited if None
+        self.MAX_TEXT_LENGTH = None # Only this many characters (bytes of bytes input) of a longer text are analysed
+        self.SAMPLE_LONG_TEXTS = False # If true a longer text is sampled in SAMPLE_WINDOWS evenly spaced windows, otherwise only its start is analysed
+        self.SAMPLE_WINDOWS = 8
+        self.MAX_UNIQUE_TERMS = None # Past this many entries a frequency list only keeps counting its most frequent terms (space-saving)
+
+        # Quick tags (see quick_tags), prefixes of the text are analysed until the top tags settle or the budget is spent
+        self.QUICK_TAGS_BUDGET = 0.005 # Seconds quick_tags may take, unless a budget is given per call
+        self.QUICK_TAGS_FIRST_PIECE = 4096 # Characters (bytes of bytes input) in the first prefix, each next piece of the text is twice as long
+        self.QUICK_TAGS_STABLE_ROUNDS = 2 # Pieces after which the top tags must not have changed for quick_tags to stop early
+
+        # Bytes input (bytes, bytearray, memoryview or mmap) is read in chunks, only the chunks or the candidates in them are decoded
+        self.ENCODING = 'utf-8'
+        self.CHUNK_SIZE = 1 << 20 # Chunks are about this many bytes, ending at a line break or the end of a sentence where possible
        
-        # Remove all whitespace characters (certain white space characters are turned into boundaries)
-        self.WHITESPACE_EXPRESSION = re.compile(r"(\')?([^a-zA-Z0-9_\.\!\?\:\;\n\r\f\t])")
-        # Look for compound terms (bi- and trigrams) based on capitalization, accounting for corner cases like PayPal, McKinley etc.
-        # TODO Need to estimate whether this is too greedy or not
-        self.CAPITALIZED_NGRAM_EXPRESSION = re.compile(r"(([A-Z][a-z]*)?[A-Z][a-z]+ (of )?(Mc|Mac)?[A-Z][a-z]+([ \-][A-Z][a-z]+)?([ ][A-Z][a-z]+)?)")
-        # Special Terms Expression to extract e.g. abbreviations and acronyms (with support for CamelCase words like JavaScript)
-        self.SPECIAL_TERMS_EXPRESSION = re.compile(r"\b([A-Za-z]{1,2}\-[A-Za-z]+)|(([A-Z]\.){2,})|((([A-Z][A-Z0-9\-\:\_\+]+)|([A-Z]+[a-z]*?[A-Z][a-z]*?))( [A-Z][A-Za-z]+)?( [A-Z][A-Za-z]+)?( [0-9]*(\.[0-9]*)?)?)\b")
+        # The language specific regular expressions (whitespace, capitalised n-grams and special terms) live in the language pack
         # This expression looks for 'short numbers' with less than four digits (this will be included in stopword expression)
         self.SHORT_NUMBERS_EXPRESSION = '[0-9]{1,3}'
        
@@ -188,36 +273,179 @@ class Tagger():
         self.whitelistCache = {}
         # Tag constants
         self.tagConstants = None
+        # The language pack of the text being analysed
+        self.languagePack = None
+        # Language detector, the shared detector is used if none is set
+        self.languageDetector = None
+        # Seconds quick_tags took per character (or byte) the last time, the first piece is made to fit the budget with it
+        self._quickTagsRate = None
+
+        # Profiling, off unless a sample rate is set (see autotagger.profiling)
+        self.PROFILE_SAMPLE_RATE = 0 # Fraction of the analyse_text calls whose stages and stacks are profiled, calls are only timed (for the slow-document log) if > 0
+        # Sampling profiler, the shared profiler is used if none is set
+        self.profiler = None
+        # The profile of the call being analysed, if it is sampled
+        self._profile = None
+
+    def analyse_text(self, text, numberOfTagsToReturn, language=None ):
+        if not self.PROFILE_SAMPLE_RATE:
+            return self._analyseText( text, numberOfTagsToReturn, language )
+
+        # Timing the call and profiling a sample of the calls, the profiler is only loaded once this is switched on
+        profiler = self._getProfiler()
+        profile = profiler.start( text, self.PROFILE_SAMPLE_RATE )
+        if profile.sampled:
+            self._profile = profile
+        tagSet = None
+        try:
+            tagSet = self._analyseText( text, numberOfTagsToReturn, language )
+            return tagSet
+        finally:
+            self._profile = None
+            profiler.stop( profile, tagSet )
 
-    def analyse_text(self, text, numberOfTagsToReturn ):
+    def _analyseText(self, text, numberOfTagsToReturn, language ):
         # Starting
         startTime = datetime.datetime.now()
 
+        # Detecting the language, this only looks at a prefix of the text
+        if language is None and self.DETECT_LANGUAGE:
+            self._mark('language detection')
+            language = self._getLanguageDetector().detect( text )
+            if language is None and self.SKIP_UNDETECTED_LANGUAGE:
+                self._setAlgorithmTime(datetime.datetime.now() -startTime )
+                return TagSet()
 
-        # Data Structures
-        frequencyListSingleTerms = FrequencyList()
-        frequencyListCapitalisedCompoundTerms = FrequencyList()
-        frequencyListSimpleBigramTerms = FrequencyList()
-        frequencyListSpecialTerms = FrequencyList()
-       
         # Instance Variables
         algorithmTime = 0
 
-       	# Preprocessing text
-       
-        # Replacing all whitespace characters with a single space
-        textWithWhitespaceRemoved =self.WHITESPACE_EXPRESSION.sub(' ',' ' + text + ' ') #check
+        # 1st pass, building the frequency lists
+        frequencyLists = self.extract_candidates( text, language )
+
+        # 2nd and 3rd pass, scoring and ordering
+        tagSetToBeReturned = self.score_candidates( frequencyLists, numberOfTagsToReturn )
+
+        # Done
+        self._setAlgorithmTime(datetime.datetime.now() -startTime )
        
-        # Swapping certain punctuation for a boundary marker
-        textWithBoundaryMarkers =re.sub( "([ ]*[\.\!\?\:\;\n\r\f\t][ ]*)+",' ' + AUTOTAGS['BOUNDARY'] + ' ',textWithWhitespaceRemoved) #check
-        
-        # Removing stopwords
-        textWithWhitespaceAndStopwordsRemoved =self._getStopWordRegExpression().sub(' ', textWithBoundaryMarkers) #check
+        return tagSetToBeReturned
+
+    def quick_tags(self, text, numberOfTagsToReturn, budget=None, language=None ):
+        # Tags within a time budget (in seconds), for callers that would rather have slightly worse tags than wait for them.
+        # The text is analysed in pieces from its start, each twice as long as the one before, and the candidates found so
+        # far are scored after each piece. This stops early once the top tags have settled, or when the next piece isn't
+        # expected to fit in what is left of the budget, and the tags are then marked 'partial' (see TagSet.isPartial)
+        startTime = timeit.default_timer()
+        if budget is None:
+            budget = self.QUICK_TAGS_BUDGET
+        deadline = startTime + budget
+
+        if language is None and self.DETECT_LANGUAGE:
+            language = self._getLanguageDetector().detect( text )
+            if language is None and self.SKIP_UNDETECTED_LANGUAGE:
+                return TagSet()
+        languagePack = self._setLanguagePack( language )
+        if languagePack.vocabulary.isFull():
+            languagePack.resetVocabulary()
+        frequencyLists = FrequencyListSet( languagePack.code, self.MAX_UNIQUE_TERMS )
+
+        firstPiece = self.QUICK_TAGS_FIRST_PIECE
+        if self._quickTagsRate:
+            firstPiece = max( min( firstPiece, int( budget / 2 / self._quickTagsRate ) ), 256 )
+
+        tagSet = None
+        partial = False
+        stableRounds = 0
+        extractionTime = 0.0
+        extractedLength = 0
+        scoringTime = 0.0
+        for piece, isLast in self._readPrefixPieces( text, languagePack, frequencyLists.approximations, firstPiece ):
+            # Estimating the cost of the next piece from the pieces before it
+            if tagSet != None and timeit.default_timer() + len(piece) * extractionTime / extractedLength + scoringTime > deadline:
+                partial = True
+                break
+
+            pieceStart = timeit.default_timer()
+            self._extractChunk( piece, languagePack, frequencyLists, None )
+            extractionTime += timeit.default_timer() - pieceStart
+            extractedLength += max( len(piece), 1 )
+            self._quickTagsRate = extractionTime / extractedLength
+
+            scoringStart = timeit.default_timer()
+            if isLast:
+                # The whole text has been read, the lists themselves are scored
+                tagSet = self.score_candidates( frequencyLists, numberOfTagsToReturn )
+                break
+            previousTagSet = tagSet
+            tagSet = self.score_candidates( frequencyLists.copy(), numberOfTagsToReturn )
+            scoringTime = timeit.default_timer() - scoringStart
+
+            if previousTagSet != None and _tagValues( previousTagSet ) == _tagValues( tagSet ):
+                stableRounds += 1
+            else:
+                stableRounds = 0
+            if stableRounds >= self.QUICK_TAGS_STABLE_ROUNDS or timeit.default_timer() >= deadline:
+                partial = True
+                break
+
+        if tagSet == None:
+            # Nothing to read
+            tagSet = self.score_candidates( frequencyLists, numberOfTagsToReturn )
+        if partial:
+            tagSet.approximations.append( 'partial' )
+        self._setAlgorithmTime( datetime.timedelta( seconds=timeit.default_timer() - startTime ) )
+        return tagSet
+
+    def extract_candidates(self, text, language=None ):
+        # Runs the preprocessing and the 1st pass only, the returned frequency lists can be
+        # serialised, merged with the lists of other texts and scored later with score_candidates
+
+        # Selecting the language pack, it is loaded on first use and shared between all taggers
+        languagePack = self._setLanguagePack(language)
+
+        # Bounding the interned term ids, lists built before keep the vocabulary they were built with
+        if languagePack.vocabulary.isFull():
+            languagePack.resetVocabulary()
 
-        # Splitting tokens into individual terms
-        tokensToProcess = textWithWhitespaceAndStopwordsRemoved.split(' ')
-        
-   
+        # Data Structures
+        frequencyLists = FrequencyListSet( languagePack.code, self.MAX_UNIQUE_TERMS )
+
+        # The normalised token stream is only kept if it is needed for a fingerprint
+        if self.FINGERPRINT != None:
+            tokenStream = []
+        else:
+            tokenStream = None
+
+        # Keeping the text within the memory budget, bytes input is read a chunk at a time
+        self._mark('reading')
+        for chunk in self._readChunks( text, languagePack, frequencyLists.approximations ):
+            self._extractChunk( chunk, languagePack, frequencyLists, tokenStream )
+            self._mark('reading')
+
+        # Fingerprinting the text (for near-duplicate detection) from the same token stream
+        if tokenStream != None:
+            self._mark('fingerprint')
+            from autotagger.fingerprint import fingerprint
+            frequencyLists.fingerprint = fingerprint( tokenStream, self.FINGERPRINT )
+
+        return frequencyLists
+
+    def _extractChunk(self, text, languagePack, frequencyLists, tokenStream ):
+        # The 1st pass over a text, or a chunk of bytes input (the candidates in bytes are decoded as they are found)
+        binary = not isinstance( text, TEXT_TYPES )
+        if binary:
+            expressions = languagePack.getBinaryExpressions()
+        else:
+            expressions = languagePack
+        frequencyListSingleTerms = frequencyLists.singleTerms
+        frequencyListCapitalisedCompoundTerms = frequencyLists.capitalisedCompoundTerms
+        frequencyListSpecialTerms = frequencyLists.specialTerms
+
+       	# Preprocessing text
+        textWithBoundaryMarkers, tokensToProcess = self._preprocess( text, languagePack )
+        self._mark('single terms')
+        if binary:
+            tokensToProcess = _decodeTokens( tokensToProcess, self.TOKEN_LENGTH_CUTOFF )
 
         """
         
@@ -228,28 +456,36 @@ class Tagger():
         # Identifying all single term candidates
         nums = range(len(tokensToProcess))
         for i in nums:
+            if i % VOCABULARY_CHECK_INTERVAL == 0:
+                self._boundVocabulary( languagePack, frequencyLists )
             token = tokensToProcess[i];
             if len(token) > self.TOKEN_LENGTH_CUTOFF:
-                term = Term()
+                term = Term(languagePack)
                 term.setBoost(self.SINGLE_TERM_BOOST)
                 term.setValue( token )
                 term.ignoreTermFreqCutoff = False
 
                 # Adding the candidate to the frequency list
                 frequencyListSingleTerms.addTerm( term )
-                
-        
+                if tokenStream != None:
+                    tokenStream.append( term.getTermId() )
+
      
         # Identifying all special terms
         if self.EXTRACT_SPECIAL_TERMS:
-            specialTerms = self.SPECIAL_TERMS_EXPRESSION.findall( text );
+            self._mark('special terms')
+            self._boundVocabulary( languagePack, frequencyLists )
+            specialTerms = expressions.specialTermsExpression.findall( text );
            
             if specialTerms != None :
                 for special_term in specialTerms:
-                    term = Term()
+                    term = Term(languagePack)
                     term.setTermType(TermConstants['TYPE_SPECIAL_TERM'])
                     term.setBoost(self.SPECIAL_TERM_BOOST)
-                    term.setValue( special_term[3].strip())
+                    if binary:
+                        term.setValue( special_term[3].strip().decode('ascii') )
+                    else:
+                        term.setValue( special_term[3].strip())
                     term.ignoreTermFreqCutoff = True;
                     # Adding the candidate to the frequency list
                     frequencyListSpecialTerms.addTerm( term )
@@ -257,20 +493,25 @@ class Tagger():
 
         
         # Identifying compound terms based on capitalization
-        capitalizedNGrams = self.CAPITALIZED_NGRAM_EXPRESSION.match( textWithBoundaryMarkers );
+        self._mark('capitalised n-grams')
+        self._boundVocabulary( languagePack, frequencyLists )
+        capitalizedNGrams = expressions.capitalizedNGramExpression.findall( textWithBoundaryMarkers );
        
         if capitalizedNGrams != None:
                 
                 for capitalizedNGram in capitalizedNGrams:
-                    compoundTermValue = capitalizedNGram
+                    # The first group is the whole n-gram
+                    compoundTermValue = capitalizedNGram[0]
+                    if binary:
+                        compoundTermValue = compoundTermValue.decode('ascii')
 
                     # The compound term should not start with a word from the blacklist, I try removing it and see what I'm left with.
                     compoundTermArray = compoundTermValue.split(' ')
                     if self.isInBlackList( compoundTermArray[0] ):
-                        compoundTermValue = compoundTermValue.substr( compoundTermValue.indexOf(' ') + 1 )
+                        compoundTermValue = compoundTermValue[compoundTermValue.index(' ') + 1:]
                     
                    
-                    term = Term()
+                    term = Term(languagePack)
                     term.setTermType(TermConstants['TYPE_CAPITALISED_COMPOUND_TERM'])
                     term.setBoost(self.NGRAM_BASED_ON_CAPITALISATION_BOOST)
                     term.setValue( compoundTermValue )
@@ -279,34 +520,223 @@ class Tagger():
                     # Adding the candidate to the frequency list
                     frequencyListCapitalisedCompoundTerms.addTerm( term )
 
-        # Identifying bi-grams in the text
-        bigrams = textWithBoundaryMarkers.split(' ')
-        nums = range(len(bigrams))
-        
-        for i in nums:
-            position = i
-            
-            token1 = bigrams[position]
-            if position +1 <= len(bigrams)-1:
-                token2 = bigrams[position + 1]
-            else:
-                token2 = None
-        
-            if token1 != None and token2 != None and (len(token1) > 2 and len(token2) > 2 ) and self.isInBlackList(token1) == False and self.isInBlackList(token2) == False:
-                bigram = token1 + ' ' + token2
-                term = Term()
+        # Identifying bi-grams (and longer simple n-grams) in the text
+        self._mark('bigrams')
+        if binary:
+            tokens = _decodeTokens( textWithBoundaryMarkers.split(b' '), 2 )
+        else:
+            tokens = textWithBoundaryMarkers.split(' ')
+        self._extractNGrams( tokens, languagePack, frequencyLists )
+
+    def _extractNGrams(self, tokens, languagePack, frequencyLists ):
+        # Every run of 2 to MAX_NGRAM_LENGTH tokens that are longer than 2 characters, not stopwords and not boundaries.
+        # Whether a token can be part of an n-gram is looked up once per distinct token, and the n-grams ending at each
+        # token are the windows over the run of such tokens before it, so this is linear in the tokens times n
+        maxLength = self.MAX_NGRAM_LENGTH
+        if maxLength < 1 or maxLength > MAX_NGRAM_LENGTH_LIMIT:
+            raise ValueError('MAX_NGRAM_LENGTH must be between 1 and %d: %s' % (MAX_NGRAM_LENGTH_LIMIT, maxLength))
+        boundary = AUTOTAGS['BOUNDARY']
+        isStopWord = languagePack.isStopWord
+        flags = {}
+        run = 0
+        for position in range(len(tokens)):
+            if position % VOCABULARY_CHECK_INTERVAL == 0:
+                self._boundVocabulary( languagePack, frequencyLists )
+            token = tokens[position]
+            flag = flags.get( token )
+            if flag is None:
+                flag = flags[token] = len(token) > 2 and token != boundary and not isStopWord( token )
+            if not flag:
+                run = 0
+                continue
+            run += 1
+            for length in range(2, min( run, maxLength ) + 1):
+                term = Term(languagePack)
                 term.setTermType(TermConstants['TYPE_SIMPLE_BIGRAM_TERM'])
                 term.setBoost(self.BIGRAM_BOOST)
-                term.setValue( bigram )
+                term.setValue( ' '.join( tokens[position - length + 1:position + 1] ) )
                 term.ignoreTermFreqCutoff = False
-               
+
                 # Adding the candidate to the frequency list
-                frequencyListSimpleBigramTerms.addTerm( term )
-                
+                frequencyLists.simpleBigramTerms.addTerm( term )
+
+    def _boundVocabulary(self, languagePack, frequencyLists ):
+        # Keeping the vocabulary within its size while a text is read. Once it is full the terms in the lists are
+        # re-interned in a new vocabulary, which drops the ids of every term the lists don't hold (evicted ones, and the
+        # tokens looked up before). Lists holding half the size or more are what takes the memory (see MAX_UNIQUE_TERMS),
+        # re-interning them would not make room and is skipped
+        vocabulary = languagePack.vocabulary
+        if vocabulary.isFull() and frequencyLists.vocabulary is vocabulary and frequencyLists.size() < vocabulary.MAX_SIZE // 2:
+            frequencyLists.rebase( languagePack.resetVocabulary() )
+
+    def tokenize(self, text, language=None ):
+        # The normalised (stopwords removed, lowercased and stemmed) single term tokens of the text, in order.
+        # These are the term ids of the single term candidates built by the 1st pass
+        languagePack = self._setLanguagePack(language)
+        vocabulary = languagePack.vocabulary
+
+        tokens = []
+        for chunk in self._readChunks( text, languagePack, [] ):
+            textWithBoundaryMarkers, tokensToProcess = self._preprocess( chunk, languagePack )
+            if not isinstance( chunk, TEXT_TYPES ):
+                tokensToProcess = _decodeTokens( tokensToProcess, self.TOKEN_LENGTH_CUTOFF )
+
+            for token in tokensToProcess:
+                if len(token) > self.TOKEN_LENGTH_CUTOFF:
+                    if AUTOTAGS['APPLY_STEMMING']:
+                        tokens.append( vocabulary.getString( vocabulary.getTokenId( token ) ) )
+                    else:
+                        tokens.append( token.lower() )
+        return tokens
+
+    def _readChunks(self, text, languagePack, approximations ):
+        # Text is analysed whole. Bytes input is read in chunks ending at line breaks, which are matched as they are if
+        # they are ASCII and the language pack allows (the candidates are decoded) or else decoded one at a time, so the
+        # input is never copied whole
+        if isinstance( text, TEXT_TYPES ):
+            return [ self._limitText( text, approximations ) ]
+        if codecs.lookup( self.ENCODING ).name not in ASCII_COMPATIBLE_ENCODINGS:
+            # Line breaks can't be found in the bytes, so the input is decoded whole
+            return [ self._limitText( _sliceBytes( text, 0, len(text) ).decode( self.ENCODING, 'replace' ), approximations ) ]
+        return self._readBinaryChunks( text, languagePack.getBinaryExpressions(), approximations )
+
+    def _readBinaryChunks(self, data, expressions, approximations ):
+        length = len(data)
+        for start, end in self._limitRanges( length, approximations ):
+            position = start
+            while position < end:
+                chunkEnd = min( position + self.CHUNK_SIZE, end )
+                chunk = _sliceBytes( data, position, chunkEnd )
+                if chunkEnd == end and end < length:
+                    # The end of a window is cut at its last space (see _cutAtWhitespace)
+                    lastSpace = chunk.rfind( b' ' )
+                    if lastSpace > 0:
+                        chunk = chunk[:lastSpace]
+                elif chunkEnd < length:
+                    chunkLength, exact = _chunkLength( chunk )
+                    chunk = chunk[:chunkLength]
+                    if not exact and 'split' not in approximations:
+                        approximations.append( 'split' )
+
+                # Not starting a window in the middle of a word (see _cutAtWhitespace)
+                firstSpace = -1
+                if position == start and start > 0:
+                    firstSpace = chunk.find( b' ' )
+                position += len(chunk)
+                if chunkEnd == end:
+                    # The rest of the window is the start of a word that was cut off
+                    position = end
+                if firstSpace != -1:
+                    chunk = chunk[firstSpace + 1:]
+
+                if expressions is None or not expressions.isAscii( chunk ):
+                    yield chunk.decode( self.ENCODING, 'replace' )
+                else:
+                    yield chunk
+
+    def _readPrefixPieces(self, text, languagePack, approximations, firstPiece ):
+        # The pieces quick_tags reads, (piece, True for the last piece), from the start of the text and doubling in size.
+        # Pieces end like chunks of bytes input (see _chunkLength), and text past MAX_TEXT_LENGTH is dropped
+        binary = not isinstance( text, TEXT_TYPES )
+        if binary and codecs.lookup( self.ENCODING ).name not in ASCII_COMPATIBLE_ENCODINGS:
+            text = _sliceBytes( text, 0, len(text) ).decode( self.ENCODING, 'replace' )
+            binary = False
+        expressions = languagePack.getBinaryExpressions()
+
+        length = len(text)
+        if self.MAX_TEXT_LENGTH != None and length > self.MAX_TEXT_LENGTH:
+            approximations.append( 'truncated' )
+            length = self.MAX_TEXT_LENGTH
+
+        position = 0
+        size = firstPiece
+        while position < length:
+            end = min( position + size, length )
+            if binary:
+                piece = _sliceBytes( text, position, end )
+            else:
+                piece = text[position:end]
+            if end < len(text):
+                pieceLength, exact = _pieceLength( piece )
+                piece = piece[:pieceLength]
+                if not exact and 'split' not in approximations:
+                    approximations.append( 'split' )
+            position += len(piece)
+            if end == length:
+                # The rest of a truncated text is the start of a word that was cut off
+                position = length
+            if binary and (expressions is None or not expressions.isAscii( piece )):
+                piece = piece.decode( self.ENCODING, 'replace' )
+            yield piece, position >= length
+            size *= 2
+
+    def _limitText(self, text, approximations ):
+        ranges = self._limitRanges( len(text), approximations )
+        if len(ranges) == 1 and ranges[0] == ( 0, len(text) ):
+            return text
+
+        # Cutting the windows out, separated by line breaks so no compound terms are made across them
+        windows = []
+        for start, end in ranges:
+            windows.append( _cutAtWhitespace( text, start, end - start ) )
+        return '\n'.join( windows )
+
+    def _limitRanges(self, length, approximations ):
+        # The (start, end) ranges of a text of the given length that are analysed
+        if self.MAX_TEXT_LENGTH == None or length <= self.MAX_TEXT_LENGTH:
+            return [ ( 0, length ) ]
+
+        if not self.SAMPLE_LONG_TEXTS:
+            approximations.append( 'truncated' )
+            return [ ( 0, self.MAX_TEXT_LENGTH ) ]
+
+        # Taking evenly spaced windows
+        approximations.append( 'sampled' )
+        windowLength = self.MAX_TEXT_LENGTH // self.SAMPLE_WINDOWS
+        step = (length - windowLength) // max(self.SAMPLE_WINDOWS - 1, 1)
+        ranges = []
+        for window in range(self.SAMPLE_WINDOWS):
+            ranges.append( ( window * step, window * step + windowLength ) )
+        return ranges
+
+    def _preprocess(self, text, languagePack ):
+        binary = not isinstance( text, TEXT_TYPES )
+        if not binary:
+            expressions = languagePack
+            space = ' '
+            boundary = AUTOTAGS['BOUNDARY']
+        else:
+            # Matching bytes as they are
+            expressions = languagePack.getBinaryExpressions()
+            space = b' '
+            boundary = AUTOTAGS['BOUNDARY'].encode('ascii')
 
+        # Replacing all whitespace characters with a single space
+        self._mark('preprocess')
+        textWithWhitespaceRemoved =expressions.whitespaceExpression.sub(space,space + text + space) #check
+       
+        # Swapping certain punctuation for a boundary marker
+        textWithBoundaryMarkers =expressions.boundaryExpression.sub(space + boundary + space,textWithWhitespaceRemoved) #check
+        
+        # Removing stopwords
+        self._mark('stopword regex')
+        textWithWhitespaceAndStopwordsRemoved =self._getStopWordRegExpression( binary ).sub(space, textWithBoundaryMarkers) #check
 
+        # Splitting tokens into individual terms
+        tokensToProcess = textWithWhitespaceAndStopwordsRemoved.split(space)
+
+        return textWithBoundaryMarkers, tokensToProcess
 
+    def score_candidates(self, frequencyListSet, numberOfTagsToReturn ):
+        # Runs the 2nd and 3rd pass over frequency lists built by extract_candidates (or merged from several texts)
+        # The terms in the lists are modified while scoring, so the lists should not be scored twice
 
+        languagePack = self._setLanguagePack( frequencyListSet.language )
+        self._mark('2nd pass')
+        # The term ids of the lists are interned by this vocabulary
+        vocabulary = frequencyListSet.vocabulary
+        frequencyListSingleTerms = frequencyListSet.singleTerms
+        frequencyListSimpleBigramTerms = frequencyListSet.simpleBigramTerms
         
         """
         
@@ -317,7 +747,7 @@ class Tagger():
         temporaryTagSet = TagSet();
        
         # The order in which the frequency lists are analyzed is important!!!
-        frequencyLists = [ frequencyListSpecialTerms, frequencyListCapitalisedCompoundTerms, frequencyListSimpleBigramTerms, frequencyListSingleTerms ];
+        frequencyLists = frequencyListSet.getLists()
         nums = range(len(frequencyLists))
         for listId in nums:
             listBeingProcessed = frequencyLists[listId];
@@ -344,10 +774,10 @@ class Tagger():
                                             continue
                                         else:
                                             # Checking if this special term exists in the list being processed
-                                            termToLookup = term.getTermId();
+                                            termToLookup = term.getId();
                                             # I'm maybe being to greedy here - if the special term doesn't exist in it's natural form in the single term list I try stemming it...
                                             if specialTermLookupList == frequencyListSingleTerms and specialTermLookupList.getTermById( termToLookup ) == None:
-                                                    termToLookup = _stemToken(termToLookup)
+                                                    termToLookup = vocabulary.getTokenId( term.getTermId() )
                                             
                                             if specialTermLookupList.getTermById( termToLookup ) != None:
                                                 specialTermInList = specialTermLookupList.getTermById( termToLookup );
@@ -366,7 +796,7 @@ class Tagger():
                                  bigrams and therefore we should consider which frequency number to use, since there clearly might be more instances if
                                  we ignore case.
                                 """ 
-                                bigram = frequencyListSimpleBigramTerms.getTermById( term.getTermId() )
+                                bigram = frequencyListSimpleBigramTerms.getTermById( term.getId() )
                                
                                 if bigram != None:
                                         # The capitalised compound term exists as a bigram
@@ -378,17 +808,17 @@ class Tagger():
                                             ignoreTerm = True
                                         else:
                                             # There is an equal or less number of bigrams, therefore I remove the bigram and go with the capitalised variant
-                                            frequencyListSimpleBigramTerms.deleteTermById( term.getTermId() )
+                                            frequencyListSimpleBigramTerms.deleteTermById( term.getId() )
 
                                
                                 # Now checking if it exists as a simple term (that might happen if I remove blacklisted word at the front)
-                                simpleTerm = frequencyListSingleTerms.getTermById( term.getTermId() )
+                                simpleTerm = frequencyListSingleTerms.getTermById( term.getId() )
                                 if not ignoreTerm and simpleTerm != None:
                                     if simpleTerm.getScore() > term.getScore():
                                             simpleTerm.addBoost( self.CAPITALIZATION_BOOST )
                                             ignoreTerm = True
                                     else:
-                                            frequencyListSingleTerms.deleteTermById( term.getTermId() )
+                                            frequencyListSingleTerms.deleteTermById( term.getId() )
 
                            
                             """
@@ -398,6 +828,9 @@ class Tagger():
                             # Term is in the whitelist
                             if self.isInWhiteList( term.getValue() ): 
                                 term.addBoost( self.WHITE_LIST_BOOST )
+                            # Term is a simple n-gram longer than a bigram
+                            if term.termType == TermConstants['TYPE_SIMPLE_BIGRAM_TERM'] and term.getValue().count(' ') > 1:
+                                term.addBoost( self.NGRAM_LENGTH_BOOST ** ( term.getValue().count(' ') - 1 ) )
                             if not term.isCompoundTerm():
                                 # Term is capitalized
                                 if term.getValue()[0].upper() == term.getValue()[0]:
@@ -428,14 +861,22 @@ class Tagger():
         """
         
         # Sorting the TagSet array by score
+        self._mark('3rd pass')
         temporaryTagSet.sortByScore()
        
         # Final TagSet to be returned
         tagSetToBeReturned = TagSet();
+        tagSetToBeReturned.language = languagePack.code
+        tagSetToBeReturned.fingerprint = frequencyListSet.fingerprint
+        tagSetToBeReturned.approximations = list( frequencyListSet.approximations )
+        if frequencyListSet.isCapped():
+            tagSetToBeReturned.approximations.append( 'capped' )
        
-        # This array will hold bigrams of the detected compound terms for quick lookup when general bigrams are detected
-        temporaryBigramArrayOfCapitalizedNGrams = []
-        temporaryArrayOfSplitBigrams = []
+        # This array will hold the n-grams within higher scoring compound terms and simple n-grams for quick lookup when
+        # general bigrams (and shorter simple n-grams) are detected
+        temporaryBigramArrayOfCapitalizedNGrams = set()
+        # Components (interned ids) of higher scoring n-grams for downweighting single terms (a set, since it is looked up for every single term)
+        temporaryArrayOfSplitBigrams = set()
        
         for  t in temporaryTagSet.tags:
                 term = t #temporaryTagSet.tags[t];
@@ -443,8 +884,9 @@ class Tagger():
                
                 if term.termType == TermConstants['TYPE_CAPITALISED_COMPOUND_TERM']:
                         # Checking if term is TYPE_CAPITALISED_COMPOUND_TERM
-                        # Adding a bigram of it to a temporary array
-                        temporaryBigramArrayOfCapitalizedNGrams = temporaryBigramArrayOfCapitalizedNGrams.concat( self._toBigramArray( term.getValue().lower() ) )
+                        # Adding it and the n-grams within it to a temporary array
+                        temporaryBigramArrayOfCapitalizedNGrams.add( term.getValue().lower() )
+                        temporaryBigramArrayOfCapitalizedNGrams.update( self._toBigramArray( term.getValue().lower() ) )
                         # Adding compound term components to a separate array to downweight single terms found within a
                         # higher scoring compound term
                         capitalisedCompoundTermComponents = term.getValue().lower().split(' ')
@@ -452,15 +894,19 @@ class Tagger():
                         for t2 in it:
                             tokenToAdd = capitalisedCompoundTermComponents[t2] 
                             if AUTOTAGS['APPLY_STEMMING']:
-                                tokenToAdd = _stemToken( tokenToAdd ) 
-                            temporaryArrayOfSplitBigrams.push( tokenToAdd )
+                                tokenToAdd = vocabulary.getTokenId( tokenToAdd ) 
+                            else:
+                                tokenToAdd = vocabulary.getId( tokenToAdd )
+                            temporaryArrayOfSplitBigrams.add( tokenToAdd )
                         
                 elif  term.termType == TermConstants['TYPE_SIMPLE_BIGRAM_TERM']:
                         # If this bigram exists in the array of 'bigrams made from capitalised compound terms' it means that
                         # the capitalised compound term is higher scoring (since it went before) and therefore should the simple
                         # bigram which is      contained wholly within the capitalised compound term be downweighted.
-                        if _arrayContains( temporaryBigramArrayOfCapitalizedNGrams, term.getValue().lower() ):
+                        if term.getValue().lower() in temporaryBigramArrayOfCapitalizedNGrams:
                             term.addBoost( self.BIGRAM_ALREADY_DETECTED_BOOST )
+                        # The shorter simple n-grams within a longer one are downweighted the same way
+                        temporaryBigramArrayOfCapitalizedNGrams.update( self._toBigramArray( term.getValue().lower() ) )
                         
                        
                         # Adding bigram components to a separate array to downweight single terms found within a
@@ -470,17 +916,18 @@ class Tagger():
                         for t2 in it:
                             bigramTokenToAdd = bigramComponents[t2] 
                             if AUTOTAGS['APPLY_STEMMING']:
-                                bigramTokenToAdd = _stemToken( bigramTokenToAdd )  
-                            temporaryArrayOfSplitBigrams.append( bigramTokenToAdd )
+                                bigramTokenToAdd = vocabulary.getTokenId( bigramTokenToAdd )  
+                            else:
+                                bigramTokenToAdd = vocabulary.getId( bigramTokenToAdd )
+                            temporaryArrayOfSplitBigrams.add( bigramTokenToAdd )
                         
                        
                 elif term.termType == TermConstants['TYPE_SINGLE_TERM']:
                         # Checking if this simple term is found within a higher scoring bigram
                         # If it is found in the temporary array of split bigrams it means that it has a lower score
                         # since the bigram was processed before it.
-                        if AUTOTAGS['APPLY_STEMMING']:
-                            termValue = _stemToken(term.getValue())
-                        if _arrayContains( temporaryArrayOfSplitBigrams, termValue ):
+                        # The id of a single term is that of its (stemmed) value, like the ids of the components
+                        if term.getId() in temporaryArrayOfSplitBigrams:
                             term.addBoost( self.TERM_FROM_COMPOUND_DOWNWEIGHT )
                         
                 
@@ -502,13 +949,9 @@ class Tagger():
         tagSetToBeReturned.sortByScore();
        
         # Slicing out top tags to return
-        # TODO fix slicing..
-        #tagSetToBeReturned.tags = tagSetToBeReturned.tags.slice( 0, numberOfTagsToReturn )    
+        tagSetToBeReturned.tags = tagSetToBeReturned.tags[:numberOfTagsToReturn]
         #tagSetToBeReturned.addAllTags( self.getTagConstants() )
        
-        # Done
-        self._setAlgorithmTime(datetime.datetime.now() -startTime )
-       
         return tagSetToBeReturned        
         
     
@@ -533,16 +976,13 @@ class Tagger():
 
        
     def _toBigramArray(self, compoundTerm ):
+        # The n-grams within a compound term, every window of 2 up to one less than its number of tokens
         bigramArray = []
        
         splitTerm = compoundTerm.split( ' ' )
-        nums = range(len(splitTerm))
-        for num in nums:
-                position = num
-                token1 = splitTerm[position]
-                token2 = splitTerm[position + 1]
-                if token1 != None and token2 != None:
-                    bigramArray.push( token1 + ' ' + token2 )
+        for length in range(2, len(splitTerm)):
+            for position in range(len(splitTerm) - length + 1):
+                bigramArray.append( ' '.join( splitTerm[position:position + length] ) )
         return bigramArray
        
     def isInWhiteList(self, term ):
@@ -551,35 +991,59 @@ class Tagger():
                 if term in self.whitelistCache:
                         return self.whitelistCache[term]
                 else:
-                    inWhiteList = False
-                    if WHITELIST != None:
-                        inWhiteList = _arrayContains( WHITELIST, term.lower() )
-                        self.whitelistCache[term] = inWhiteList
+                    # Bounding the cache, a long running tagger sees an open-ended number of terms
+                    if len(self.whitelistCache) >= WHITELIST_CACHE_SIZE:
+                        self.whitelistCache.clear()
+                    inWhiteList = term.lower() in _getWhitelist()
+                    self.whitelistCache[term] = inWhiteList
                                 
                     return inWhiteList
 
 
 
     def isInBlackList(self, term ):
-        if term != AUTOTAGS['BOUNDARY'] and ( STOPWORDS != None and not term.lower() in STOPWORDS ):
+        if term != AUTOTAGS['BOUNDARY'] and not self._getLanguagePack().isStopWord(term):
             return False
         else:
             return True
 
        
-    def _getStopWordRegExpression(self):
-        blacklistExpression = AUTOTAGS['BOUNDARY']
-       
-        # Adding all blacklist terms
-        if STOPWORDS != None:
-            for term in STOPWORDS:
-                blacklistExpression += '|' + term
-
-
+    def _getStopWordRegExpression(self, binary=False ):
+        # The compiled expression is cached by the language pack
         if self.REMOVE_SHORT_NUMBERS_AS_SINGLE_TOKENS:
-            return re.compile( '\\s((' + self.SHORT_NUMBERS_EXPRESSION + '|' + blacklistExpression + ')\\s)+')
+            return self._getLanguagePack().getStopWordExpression(AUTOTAGS['BOUNDARY'], self.SHORT_NUMBERS_EXPRESSION, binary)
         else:
-            return re.compile( '\\s((' + blacklistExpression + ')\\s)+' )
+            return self._getLanguagePack().getStopWordExpression(AUTOTAGS['BOUNDARY'], None, binary)
+
+    def _setLanguagePack(self, language=None ):
+        if language is None:
+            language = self.LANGUAGE
+        self.languagePack = get_language_pack(language)
+        return self.languagePack
+
+    def _getLanguageDetector(self):
+        if self.languageDetector is None:
+            # Only imported when detection is switched on
+            from autotagger.detection import get_language_detector
+            return get_language_detector( self.ENCODING )
+        return self.languageDetector
+
+    def _getProfiler(self):
+        if self.profiler is None:
+            # Only imported when profiling is switched on
+            from autotagger.profiling import get_profiler
+            return get_profiler()
+        return self.profiler
+
+    def _mark(self, stage ):
+        # Marks the start of a pipeline stage in the profile of a sampled call
+        if self._profile != None:
+            self._profile.mark( stage )
+
+    def _getLanguagePack(self):
+        if self.languagePack is None:
+            return self._setLanguagePack()
+        return self.languagePack
 
                
     def getAlgorithmTime(self):
@@ -595,18 +1059,62 @@ class Tagger():
 
 """
 class FrequencyList:
-    def __init__(self):
+    def __init__(self, maxSize=None, vocabulary=None ):
+        # Interned term id -> term
         self._terms = {}
+        # The vocabulary the term ids are from, terms merged in from lists of another vocabulary are interned again
+        self.vocabulary = vocabulary
+        # Bounded lists keep at most maxSize terms, a min-heap of (freq, sequence, termId) finds the least frequent one
+        self.maxSize = maxSize
+        self.capped = False # True once a term has been evicted, from then on frequencies are upper bounds
+        self._heap = []
+        self._sequence = 0
 
     def addTerm(self, term ):
         # Is the term in the frequency list? If so then retrieve it and increment frequency
-        if self.getTermById( term.getTermId() ) != None:
+        if self.getTermById( term.getId() ) != None:
             # Getting only frequency from the existing term, updating everything else
-            term.freq = (self.getTermById( term.getTermId() ).freq + 1)
+            term.freq = (self.getTermById( term.getId() ).freq + 1)
+        elif self.maxSize != None and len(self._terms) >= self.maxSize:
+            # The list is full, the least frequent term makes room and the new term inherits its frequency (space-saving)
+            term.freq = self._evictLeastFrequent() + 1
+            self.capped = True
                
         # Updating frequency list with the term being processed
-        self._terms[term.getTermId()] = term
+        self._terms[term.getId()] = term
+
+        if self.maxSize != None:
+            self._sequence += 1
+            heapq.heappush( self._heap, (term.freq, self._sequence, term.getId()) )
+            if len(self._heap) > 4 * self.maxSize:
+                self._rebuildHeap()
         
+    def _evictLeastFrequent(self):
+        while True:
+            freq, sequence, termId = heapq.heappop( self._heap )
+            term = self.getTermById( termId )
+            # Skipping entries made stale by later additions (or deletions) of the term
+            if term != None and term.freq == freq:
+                del self._terms[termId]
+                return freq
+
+    def _rebuildHeap(self):
+        self._heap = []
+        for termId, term in self._terms.items():
+            self._sequence += 1
+            self._heap.append( (term.freq, self._sequence, termId) )
+        heapq.heapify( self._heap )
+
+    def _trim(self):
+        # Rebuilding the heap of a bounded list after its frequencies were changed in bulk (merge, subtract), the least
+        # frequent terms beyond maxSize are evicted
+        if self.maxSize == None:
+            return
+        self._rebuildHeap()
+        while len(self._terms) > self.maxSize:
+            self._evictLeastFrequent()
+            self.capped = True
+
        
     def getTermById(self, termId ):
         if termId in self._terms:
@@ -623,37 +1131,282 @@ class FrequencyList:
         except KeyError:
             pass
 
-
-
+    def merge(self, frequencyList ):
+        # Adds the frequencies of another list to this one, as if its terms had been added after the terms of this list.
+        # Merging is associative, so partial lists can be combined in any grouping (e.g. by a reducer)
+        for termId, term in frequencyList.getTerms().items():
+            mergedTerm = term.copy()
+            if self.vocabulary != None and term._getVocabulary() is not self.vocabulary:
+                # The term was interned by an older vocabulary of the language pack
+                mergedTerm.vocabulary = self.vocabulary
+                termId = mergedTerm._termId = self.vocabulary.getId( term.getTermId() )
+            existingTerm = self.getTermById( termId )
+            if existingTerm != None:
+                # Like addTerm the frequency is accumulated and the latest variant of the term is kept
+                mergedTerm.freq += existingTerm.freq
+                # The lists may have been built with different boosts, the strongest one wins
+                mergedTerm.boost = max( existingTerm.boost, term.boost )
+                mergedTerm.ignoreTermFreqCutoff = existingTerm.ignoreTermFreqCutoff or term.ignoreTermFreqCutoff
+            self._terms[termId] = mergedTerm
+        self.capped = self.capped or frequencyList.capped
+        self._trim()
+        return self
+
+    def rebase(self, vocabulary ):
+        # Re-interning the ids of the terms in another vocabulary, the order of the terms is kept
+        terms = self._terms
+        self._terms = {}
+        for term in terms.values():
+            term._termId = vocabulary.getId( term.getTermId() )
+            term.vocabulary = vocabulary
+            self._terms[term._termId] = term
+        self.vocabulary = vocabulary
+        if self.maxSize != None:
+            self._rebuildHeap()
+        return self
+
+    def subtract(self, frequencyList ):
+        # Takes the frequencies of a list merged in before (from the same vocabulary) back out, terms left without
+        # occurrences are removed. The variant kept for a term may have come from the subtracted list
+        for termId, term in frequencyList.getTerms().items():
+            existingTerm = self.getTermById( termId )
+            if existingTerm != None:
+                existingTerm.freq -= term.freq
+                if existingTerm.freq <= 0:
+                    del self._terms[termId]
+        self._trim()
+        return self
+
+    def _write(self, parts ):
+        parts.append( struct.pack('<BI', int(self.capped), len(self._terms)) )
+        for term in self._terms.values():
+            value = term.getValue().encode('utf-8')
+            termId = term.getTermId()
+            flags = 0
+            if term.ignoreTermFreqCutoff:
+                flags |= 1
+            # The term id is usually the lowercased value (compound terms), then it isn't stored
+            if termId == term.getValue().lower():
+                flags |= 2
+            parts.append( struct.pack('<BBIdI', TERM_TYPES.index(term.termType), flags, term.freq, term.boost, len(value)) )
+            parts.append( value )
+            if not flags & 2:
+                termId = termId.encode('utf-8')
+                parts.append( struct.pack('<I', len(termId)) )
+                parts.append( termId )
+
+    def _read(self, data, offset, languagePack ):
+        capped, count = struct.unpack_from('<BI', data, offset)
+        self.capped = bool(capped)
+        offset += 5
+        for i in range(count):
+            termType, flags, freq, boost, length = struct.unpack_from('<BBIdI', data, offset)
+            offset += 18
+            term = Term(languagePack)
+            term.termType = TERM_TYPES[termType]
+            term.ignoreTermFreqCutoff = bool(flags & 1)
+            term.freq = freq
+            term.boost = boost
+            term._term = data[offset:offset + length].decode('utf-8')
+            offset += length
+            if flags & 2:
+                term._termId = term._getVocabulary().getId( term._term.lower() )
+            else:
+                length, = struct.unpack_from('<I', data, offset)
+                offset += 4
+                term._termId = term._getVocabulary().getId( data[offset:offset + length].decode('utf-8') )
+                offset += length
+            self._terms[term.getId()] = term
+        return offset
 
 
 """
-       Get the root of a given word
-"""
-def _stemToken( token ):
-    token = token.lower()
-    # Find the root of words and cache since stemming is fairly expensive in this context
-    if  token in VARIATION_CACHE:
-        return VARIATION_CACHE[token]
-    else:
-        # Token not in the cache, stemming and adding to the cache
-       
-        stemmer_impl = _get_stemmer_impl()
-        stemmed_variant = stemmer_impl(token)
-        VARIATION_CACHE[token] = stemmed_variant
-        return stemmed_variant
-
 
-STEMMER = PorterStemmer()
-def _get_stemmer_impl():
-    return STEMMER.stem_word
+       The four frequency lists built from a text (or merged from several texts)
 
-
-def _arrayContains(array,o):
-    for obj in array:
-        if o == obj:
-            return True
-    return False
-
-# This is a cache of all root words (stemmed variants) for quick lookup (stemming is fairly expensive in this context)
-VARIATION_CACHE = {}
+"""
+class FrequencyListSet:
+    def __init__(self, language=None, maxSize=None ):
+        if language is None:
+            language = AUTOTAGS['DEFAULT_LANGUAGE']
+        self.language = language
+        # Signature of the text the lists were built from (not kept when lists are merged)
+        self.fingerprint = None
+        # How the text was cut down to fit the memory budget before the lists were built
+        self.approximations = []
+        # The vocabulary of the language pack at the time the lists were made, the term ids of all four lists are from it
+        self.vocabulary = get_language_pack( language ).vocabulary
+        self.singleTerms = FrequencyList( maxSize, self.vocabulary )
+        self.capitalisedCompoundTerms = FrequencyList( maxSize, self.vocabulary )
+        self.simpleBigramTerms = FrequencyList( maxSize, self.vocabulary )
+        self.specialTerms = FrequencyList( maxSize, self.vocabulary )
+
+    def getLists(self):
+        # The order in which the frequency lists are analyzed is important!!!
+        return [ self.specialTerms, self.capitalisedCompoundTerms, self.simpleBigramTerms, self.singleTerms ]
+
+    def merge(self, frequencyLists ):
+        if frequencyLists.language != self.language:
+            raise ValueError('Cannot merge %s frequency lists into %s ones' % (frequencyLists.language, self.language))
+        otherLists = frequencyLists.getLists()
+        ownLists = self.getLists()
+        for listId in range(len(ownLists)):
+            ownLists[listId].merge( otherLists[listId] )
+        for approximation in frequencyLists.approximations:
+            if approximation not in self.approximations:
+                self.approximations.append( approximation )
+        return self
+
+    def subtract(self, frequencyLists ):
+        if frequencyLists.language != self.language:
+            raise ValueError('Cannot subtract %s frequency lists from %s ones' % (frequencyLists.language, self.language))
+        otherLists = frequencyLists.getLists()
+        ownLists = self.getLists()
+        for listId in range(len(ownLists)):
+            ownLists[listId].subtract( otherLists[listId] )
+        return self
+
+    def rebase(self, vocabulary ):
+        for frequencyList in self.getLists():
+            frequencyList.rebase( vocabulary )
+        self.vocabulary = vocabulary
+        return self
+
+    def size(self):
+        return sum( [ len(frequencyList.getTerms()) for frequencyList in self.getLists() ] )
+
+    def isCapped(self):
+        for frequencyList in self.getLists():
+            if frequencyList.capped:
+                return True
+        return False
+
+    def copy(self):
+        return FrequencyListSet( self.language ).merge( self )
+
+    def toBytes(self, compress=True ):
+        language = self.language.encode('utf-8')
+        parts = [ struct.pack('<B', len(language)), language ]
+        for frequencyList in self.getLists():
+            frequencyList._write( parts )
+        payload = b''.join(parts)
+        if compress:
+            return FREQUENCY_LIST_MAGIC + b'z' + zlib.compress(payload, 1)
+        return FREQUENCY_LIST_MAGIC + b'-' + payload
+
+    @staticmethod
+    def fromBytes(data ):
+        if data[:len(FREQUENCY_LIST_MAGIC)] != FREQUENCY_LIST_MAGIC:
+            raise ValueError('Not a serialised frequency list set')
+        offset = len(FREQUENCY_LIST_MAGIC)
+        if data[offset:offset + 1] == b'z':
+            data = zlib.decompress(data[offset + 1:])
+        else:
+            data = data[offset + 1:]
+
+        length, = struct.unpack_from('<B', data, 0)
+        frequencyLists = FrequencyListSet( data[1:1 + length].decode('utf-8') )
+        languagePack = get_language_pack( frequencyLists.language )
+        offset = 1 + length
+        for frequencyList in frequencyLists.getLists():
+            offset = frequencyList._read( data, offset, languagePack )
+        return frequencyLists
+
+
+
+
+
+# The whitelist is loaded on first lookup
+_WHITELIST = None
+
+def _getWhitelist():
+    global _WHITELIST
+    # The whitelist of an attached resource segment is looked up in place
+    segment = get_resource_segment()
+    if segment is not None and segment.whitelist is not None:
+        return segment.whitelist
+    if _WHITELIST is None:
+        from autotagger.whitelist import WHITELIST
+        _WHITELIST = frozenset(WHITELIST or [])
+    return _WHITELIST
+
+
+def _cutAtWhitespace( text, start, length ):
+    # Cutting a window out of the text without splitting the words at its edges
+    end = start + length
+    if end < len(text):
+        lastSpace = text.rfind( ' ', start, end )
+        if lastSpace > start:
+            end = lastSpace
+    if start > 0:
+        firstSpace = text.find( ' ', start, end )
+        if firstSpace != -1:
+            start = firstSpace + 1
+    return text[start:end]
+
+
+def _sliceBytes( data, start, end ):
+    # Copying a slice out of bytes input, a memoryview or mmap is not copied beyond the slice
+    chunk = data[start:end]
+    if isinstance( chunk, memoryview ):
+        return chunk.tobytes()
+    if isinstance( chunk, bytearray ):
+        return bytes( chunk )
+    return chunk
+
+
+def _cutLength( piece ):
+    # Where a piece of text or bytes can be cut, and whether the cut is exact: after its last line break or else after the
+    # last boundary punctuation followed by a space (see _BOUNDARY_SEPARATORS) in its second half, which no candidate spans.
+    # Failing both it is cut after its last space in the second half, which may split a compound candidate. 0 if none is found
+    binary = not isinstance( piece, TEXT_TYPES )
+    half = len(piece) // 2
+    length = piece.rfind( b'\n' if binary else '\n', half ) + 1
+    if length > 0:
+        return length, True
+    for separator in _BOUNDARY_SEPARATORS:
+        if not binary:
+            separator = separator.decode('ascii')
+        position = piece.rfind( separator, half )
+        if position != -1:
+            length = max( length, position + len(separator) )
+    if length > 0:
+        return length, True
+    return piece.rfind( b' ' if binary else ' ', half ) + 1, False
+
+
+def _chunkLength( chunk ):
+    # Where a chunk of bytes input ends, see _cutLength. Failing a line break, boundary or space it is cut before an
+    # incomplete (UTF-8) character at its end
+    length, exact = _cutLength( chunk )
+    if length > 0:
+        return length, exact
+
+    length = len(chunk)
+    for position in range(len(chunk) - 1, max(len(chunk) - 4, 0), -1):
+        byte = ord( chunk[position:position + 1] )
+        if byte & 0xC0 != 0x80:
+            # A lead byte (or ASCII), the character it starts has to fit in the chunk
+            if byte >= 0xC0 and position + (2 if byte < 0xE0 else 3 if byte < 0xF0 else 4) > len(chunk):
+                length = position
+            break
+    return length, False
+
+
+def _pieceLength( piece ):
+    # Where a piece of quick_tags ends, like a chunk (see _chunkLength). Text without a space is cut anywhere
+    if not isinstance( piece, TEXT_TYPES ):
+        return _chunkLength( piece )
+    length, exact = _cutLength( piece )
+    if length > 0:
+        return length, exact
+    return len(piece), False
+
+
+def _tagValues( tagSet ):
+    return set( [ term.getValue() for term in tagSet.getTags() ] )
+
+
+def _decodeTokens( tokens, minimumLength ):
+    # Decoding the tokens matched in bytes input, which are ASCII. Tokens too short to be candidates are left empty
+    return [ token.decode('ascii') if len(token) > minimumLength else '' for token in tokens ]
@@ -0,0 +1,179 @@
+"""
+       Trending Tags
+
+       Keeps exponentially decayed counts of the tags seen on a stream of documents in
+       bounded memory, using the space-saving heavy hitters algorithm: at most CAPACITY
+       tags are tracked and a new tag replaces the weakest one, inheriting its count as
+       an error bound. Decay is applied forward (new observations are weighted up
+       instead of all counts being weighted down), so adding a tag never touches the
+       other counters. Decay keeps the order of the tags, so the TOP_SIZE strongest tags
+       are maintained as they are added and top() reads them without scanning every
+       counter.
+
+"""
+import heapq
+import itertools
+import math
+import time
+
+
+class TrendingTags:
+    def __init__(self, capacity=1000, halfLife=3600.0, topSize=100 ):
+        self.CAPACITY = capacity # Maximum number of tags tracked
+        self.HALF_LIFE = halfLife # Seconds after which an observation counts half
+        self.TOP_SIZE = topSize # Number of strongest tags kept for top(), larger queries scan every counter
+
+        self._decayRate = math.log(2) / halfLife
+        # Tag -> [weight, error], weights are relative to the landmark time
+        self._counts = {}
+        # Min-heap of (weight, sequence, tag) used to find the weakest tag, entries go stale when a tag is updated
+        self._heap = []
+        self._sequence = itertools.count()
+        self._landmark = None
+        # The TOP_SIZE strongest tags and a min-heap of (weight, sequence, tag) finding the weakest of them, with an entry
+        # per leader. The set is rebuilt from the counters when a leader is evicted
+        self._leaders = set()
+        self._leaderHeap = []
+        self._leadersValid = True
+
+    def add(self, tag, timestamp=None, weight=1.0 ):
+        if timestamp is None:
+            timestamp = time.time()
+        if self._landmark is None:
+            self._landmark = timestamp
+
+        exponent = self._decayRate * (timestamp - self._landmark)
+        if exponent > 100:
+            # Moving the landmark forward before the weights overflow
+            self._rescale(timestamp)
+            exponent = 0.0
+        weight *= math.exp(exponent)
+
+        counter = self._counts.get(tag)
+        if counter is not None:
+            counter[0] += weight
+        elif len(self._counts) < self.CAPACITY:
+            counter = self._counts[tag] = [weight, 0.0]
+        else:
+            # Replacing the weakest tag, the new tag may have been seen as often as the one it replaces
+            minimum = self._popMinimum()
+            counter = self._counts[tag] = [minimum + weight, minimum]
+
+        heapq.heappush(self._heap, (counter[0], next(self._sequence), tag))
+        if len(self._heap) > 4 * self.CAPACITY:
+            self._rebuildHeap()
+        if self._leadersValid:
+            self._updateLeaders(tag, counter[0])
+
+    def addAll(self, tags, timestamp=None ):
+        if timestamp is None:
+            timestamp = time.time()
+        for tag in tags:
+            self.add(tag, timestamp)
+
+    def addTagSet(self, tagSet, timestamp=None, numberOfTags=None ):
+        # Counting the (top) tags returned by Tagger.analyse_text
+        tags = tagSet.getTags()
+        if numberOfTags is not None:
+            tags = tags[:numberOfTags]
+        self.addAll([term.getValue() for term in tags], timestamp)
+
+    def addFrequencyList(self, frequencyList, timestamp=None ):
+        # Counting raw term ids, weighted by how often they occurred in the document
+        if timestamp is None:
+            timestamp = time.time()
+        for term in frequencyList.getTerms().values():
+            self.add(term.getTermId(), timestamp, term.freq)
+
+    def top(self, n, timestamp=None ):
+        # The n strongest tags as (tag, decayed count, maximum overestimate), strongest first. Up to TOP_SIZE tags are
+        # read from the maintained leaders in O(TOP_SIZE), more are found in O(CAPACITY)
+        if timestamp is None:
+            timestamp = time.time()
+        if self._landmark is None:
+            return []
+        decay = math.exp(-self._decayRate * (timestamp - self._landmark))
+        if n > self.TOP_SIZE:
+            candidates = self._counts.items()
+        else:
+            if not self._leadersValid:
+                self._rebuildLeaders()
+            candidates = [(tag, self._counts[tag]) for tag in self._leaders]
+        strongest = heapq.nlargest(n, candidates, key=lambda item: item[1][0])
+        return [(tag, counter[0] * decay, counter[1] * decay) for tag, counter in strongest]
+
+    def getCount(self, tag, timestamp=None ):
+        if timestamp is None:
+            timestamp = time.time()
+        counter = self._counts.get(tag)
+        if counter is None:
+            return 0.0
+        return counter[0] * math.exp(-self._decayRate * (timestamp - self._landmark))
+
+    def reset(self):
+        self._counts = {}
+        self._heap = []
+        self._landmark = None
+        self._leaders = set()
+        self._leaderHeap = []
+        self._leadersValid = True
+
+    def __len__(self):
+        return len(self._counts)
+
+    def _popMinimum(self):
+        while True:
+            weight, sequence, tag = heapq.heappop(self._heap)
+            counter = self._counts.get(tag)
+            # Skipping entries made stale by later updates of the tag
+            if counter is not None and counter[0] == weight:
+                del self._counts[tag]
+                if tag in self._leaders:
+                    # Only when (nearly) every tracked tag is a leader, the next strongest tag is found on the next query
+                    self._leaders.discard(tag)
+                    self._leadersValid = False
+                return weight
+
+    def _rescale(self, timestamp ):
+        factor = math.exp(-self._decayRate * (timestamp - self._landmark))
+        for counter in self._counts.values():
+            counter[0] *= factor
+            counter[1] *= factor
+        self._landmark = timestamp
+        self._rebuildHeap()
+        if self._leadersValid:
+            self._rebuildLeaderHeap()
+
+    def _rebuildHeap(self):
+        self._heap = [(counter[0], next(self._sequence), tag) for tag, counter in self._counts.items()]
+        heapq.heapify(self._heap)
+
+    def _updateLeaders(self, tag, weight ):
+        # Weights only grow, so a tag joins the leaders when it outgrows the weakest of them, which then leaves. The heap
+        # entries of the leaders are not updated as they grow, they are lower bounds corrected in _weakestLeader
+        if tag in self._leaders:
+            return
+        if len(self._leaders) >= self.TOP_SIZE:
+            if self.TOP_SIZE <= 0 or weight <= self._weakestLeader():
+                return
+            self._leaders.discard(heapq.heappop(self._leaderHeap)[2])
+        self._leaders.add(tag)
+        heapq.heappush(self._leaderHeap, (weight, next(self._sequence), tag))
+
+    def _weakestLeader(self):
+        while True:
+            weight, sequence, tag = self._leaderHeap[0]
+            current = self._counts[tag][0]
+            if current == weight:
+                return weight
+            heapq.heapreplace(self._leaderHeap, (current, next(self._sequence), tag))
+
+    def _rebuildLeaders(self):
+        strongest = heapq.nlargest(self.TOP_SIZE, self._counts.items(), key=lambda item: item[1][0])
+        self._leaders = set(tag for tag, counter in strongest)
+        self._leadersValid = True
+        self._rebuildLeaderHeap()
+
+    def _rebuildLeaderHeap(self):
+        self._leaderHeap = [(self._counts[tag][0], next(self._sequence), tag) for tag in self._leaders]
+        heapq.heapify(self._leaderHeap)
@@ -0,0 +1,74 @@
+"""
+       Term Vocabulary
+
+       Interns the term ids of a language pack as integers shared by every document
+       tagged in the process. A single token is mapped straight to the id of its
+       stemmed, lowercased form, so a token that was seen before is neither stemmed
+       nor lowercased again, and the frequency lists key on small integers instead of
+       a fresh string per term. The id strings are only looked up for the tags that
+       are returned (or serialised).
+
+       A vocabulary can extend a shared, read-only one (see autotagger.resources),
+       whose ids come first. Only what isn't in the shared vocabulary (and the
+       tokens looked up in it, as a cache) is held by the process.
+
+"""
+
+DEFAULT_SIZE = 500000 # Entries (term ids and tokens) a vocabulary holds before the language pack starts a new one
+
+
+class Vocabulary:
+    def __init__(self, stemmer=None, maxSize=DEFAULT_SIZE, base=None ):
+        self.MAX_SIZE = maxSize
+        self._stemmer = stemmer
+        # Shared vocabulary holding the ids below baseSize, with the same getId, getTokenId and getString (returning None if it lacks a term)
+        self.base = base
+        self.baseSize = len(base) if base is not None else 0
+        # Term id string -> integer id, and back (for the ids that aren't in the base)
+        self._ids = {}
+        self._strings = []
+        # Token (as it appears in the text) -> integer id of its stemmed, lowercased form
+        self._tokenIds = {}
+
+    def getId(self, termId ):
+        # Interning a term id, e.g. the lowercased value of a compound term
+        id = self._ids.get(termId)
+        if id is None:
+            if self.base is not None:
+                id = self.base.getId(termId)
+            if id is None:
+                id = self.baseSize + len(self._strings)
+                self._strings.append(termId)
+            self._ids[termId] = id
+        return id
+
+    def getTokenId(self, token ):
+        # The id of a single token, which is stemmed (if there is a stemmer) and lowercased the first time it is seen
+        id = self._tokenIds.get(token)
+        if id is None:
+            if self.base is not None:
+                id = self.base.getTokenId(token)
+            if id is None:
+                termId = token.lower()
+                if self._stemmer is not None:
+                    termId = self._stemmer(termId).lower()
+                id = self.getId(termId)
+            # The tokens are only a cache, past the size they are stemmed again instead (see isFull)
+            if not self.isFull():
+                self._tokenIds[token] = id
+        return id
+
+    def getString(self, id ):
+        if id < self.baseSize:
+            return self.base.getString(id)
+        return self._strings[id - self.baseSize]
+
+    def isFull(self):
+        return self.MAX_SIZE is not None and self.getSize() >= self.MAX_SIZE
+
+    def getSize(self):
+        # Entries held by this process (term ids and tokens), which MAX_SIZE bounds
+        return len(self._ids) + len(self._tokenIds)
+
+    def __len__(self):
+        return self.baseSize + len(self._strings)
@@ -16,11 +16,12 @@ class MainPage(webapp.RequestHandler):
         path = os.path.join(os.path.dirname(__file__), 'index.html')
         self.response.out.write(template.render(path, template_values))
     def post(self):
-        text =cgi.escape(self.request.get('content'))
+        text =self.request.get('content')
         te = Tagger()
+        # Tagging the text as it was posted, it is only escaped for display
         tags = te.analyse_text(text,10)
         template_values = {
-          'content':text,
+          'content':cgi.escape(text),
           'tags': tags.toList(),
           'time': (te.getAlgorithmTime().microseconds/1000)
           }
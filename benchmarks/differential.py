@@ -0,0 +1,243 @@
+"""
+       Differential tagging harness
+
+       Tags a corpus with the reference pipeline (Tagger.analyse_text) and with every
+       alternative engine, and reports per engine the documents whose tags differ from
+       the reference (missing and extra tags, largest score delta) along with its
+       throughput on the same inputs. The reference itself is checked against the
+       golden outputs recorded in benchmarks/golden. Exits with a non-zero status on
+       any mismatch.
+
+       Usage: python benchmarks/differential.py [--corpus corpus.jsonl] [--engines bytes,merged,...]
+                  [--engine module:function] [-n 10] [--repeat 3] [--update-golden]
+
+       An engine is a function taking the list of documents (dicts with 'text' and
+       optionally 'language') and the number of tags, and returning one list of
+       (tag, score) per document. Tags of equal score at the cut-off may differ.
+"""
+import argparse
+import importlib
+import io
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+
+sys.path.insert(0, os.path.join(ROOT, 'autotagger_app'))
+
+from autotagger.tagger import Tagger, FrequencyListSet
+from autotagger.incremental import IncrementalTagger
+
+
+def reference(documents, n):
+    tagger = Tagger()
+    return [_tags(tagger.analyse_text(document['text'], n, document.get('language'))) for document in documents]
+
+
+def bytes_input(documents, n):
+    # Tagging the encoded text (see Tagger.ENCODING)
+    tagger = Tagger()
+    return [_tags(tagger.analyse_text(_encode(document['text']), n, document.get('language'))) for document in documents]
+
+
+def chunked(documents, n):
+    # Bytes input read in small chunks, so that most texts are split into several
+    tagger = Tagger()
+    tagger.CHUNK_SIZE = 256
+    return [_tags(tagger.analyse_text(_encode(document['text']), n, document.get('language'))) for document in documents]
+
+
+def merged(documents, n):
+    # Extracting the candidates of every line separately and scoring the merged lists, like a map/reduce job
+    tagger = Tagger()
+    results = []
+    for document in documents:
+        frequencyLists = None
+        for line in document['text'].split('\n'):
+            lines = tagger.extract_candidates(line, document.get('language'))
+            if frequencyLists is None:
+                frequencyLists = lines
+            else:
+                frequencyLists.merge(lines)
+        results.append(_tags(tagger.score_candidates(frequencyLists, n)))
+    return results
+
+
+def serialised(documents, n):
+    # Round tripping the frequency lists through their binary form before scoring
+    tagger = Tagger()
+    results = []
+    for document in documents:
+        data = tagger.extract_candidates(document['text'], document.get('language')).toBytes()
+        results.append(_tags(tagger.score_candidates(FrequencyListSet.fromBytes(data), n)))
+    return results
+
+
+def incremental(documents, n):
+    # Re-tagging every document after an edit, it is tagged without its middle line first
+    tagger = IncrementalTagger(Tagger())
+    results = []
+    for index, document in enumerate(documents):
+        lines = document['text'].split('\n')
+        middle = len(lines) // 2
+        tagger.analyse_text('\n'.join(lines[:middle] + lines[middle + 1:]), n, document.get('language'), index)
+        results.append(_tags(tagger.analyse_text(document['text'], n, document.get('language'), index)))
+    return results
+
+
+def parallel(documents, n):
+    # Tagging the documents in a pool of processes, in input order
+    import multiprocessing
+    pool = multiprocessing.Pool()
+    try:
+        return pool.map(_tagDocument, [(document, n) for document in documents])
+    finally:
+        pool.terminate()
+
+
+ENGINES = {
+        'bytes' : bytes_input,
+        'chunked' : chunked,
+        'incremental' : incremental,
+        'merged' : merged,
+        'serialised' : serialised,
+        'parallel' : parallel
+}
+
+
+def compare(expected, actual, n, tolerance):
+    # Returns (missing tags, extra tags, largest score delta), tags tying with the last of n tags may be swapped for each other
+    expectedScores = dict(expected)
+    actualScores = dict(actual)
+    missing = [tag for tag, score in expected if tag not in actualScores and not _atCutoff(score, actual, n, tolerance)]
+    extra = [tag for tag, score in actual if tag not in expectedScores and not _atCutoff(score, expected, n, tolerance)]
+    delta = 0.0
+    for tag in expectedScores:
+        if tag in actualScores:
+            delta = max(delta, abs(expectedScores[tag] - actualScores[tag]))
+    return missing, extra, delta
+
+
+def load_corpus(path):
+    documents = []
+    with io.open(path, encoding='utf-8') as stream:
+        for line in stream:
+            if line.strip():
+                document = json.loads(line)
+                if 'file' in document:
+                    with io.open(os.path.join(ROOT, document['file']), encoding='utf-8') as text:
+                        document['text'] = text.read()
+                documents.append(document)
+    return documents
+
+
+def load_golden(path, documents):
+    golden = {}
+    with io.open(path, encoding='utf-8') as stream:
+        for line in stream:
+            if line.strip():
+                record = json.loads(line)
+                golden[record['id']] = [tuple(tag) for tag in record['tags']]
+    return [golden.get(document['id'], []) for document in documents]
+
+
+def load_engine(name):
+    if name in ENGINES:
+        return ENGINES[name]
+    moduleName, functionName = name.split(':')
+    return getattr(importlib.import_module(moduleName), functionName)
+
+
+def run(engine, documents, n, repeat):
+    # The results and the best time of repeat runs
+    best = None
+    for i in range(repeat):
+        start = timeit.default_timer()
+        results = engine(documents, n)
+        seconds = timeit.default_timer() - start
+        if best is None or seconds < best:
+            best = seconds
+    return results, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--corpus', default=os.path.join(GOLDEN_DIR, 'corpus.jsonl'))
+    parser.add_argument('--golden', default=os.path.join(GOLDEN_DIR, 'expected.jsonl'), help='recorded reference outputs')
+    parser.add_argument('--engines', default=','.join(sorted(ENGINES)), help='built-in engines to compare')
+    parser.add_argument('--engine', action='append', default=[], help='additional engine, as module:function')
+    parser.add_argument('-n', '--tags', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3, help='runs per engine, the fastest is reported')
+    parser.add_argument('--tolerance', type=float, default=1e-9, help='allowed score difference')
+    parser.add_argument('--update-golden', action='store_true', help='record the reference outputs as the golden outputs')
+    args = parser.parse_args()
+
+    documents = load_corpus(args.corpus)
+    size = sum(len(document['text'].encode('utf-8')) for document in documents)
+    referenceResults, seconds = run(reference, documents, args.tags, args.repeat)
+
+    if args.update_golden:
+        with io.open(args.golden, 'w', encoding='utf-8') as stream:
+            for document, tags in zip(documents, referenceResults):
+                stream.write(json.dumps({ 'id' : document['id'], 'tags' : tags }, ensure_ascii=False, sort_keys=True) + u'\n')
+        print('recorded the golden outputs of %d documents in %s' % (len(documents), args.golden))
+        return 0
+
+    # (engine, results, seconds, expected results), the reference is checked against the golden outputs and the engines against the reference
+    rows = []
+    if os.path.exists(args.golden):
+        rows.append(('reference', referenceResults, seconds, load_golden(args.golden, documents)))
+    else:
+        print('no golden outputs in %s, the reference is not checked' % args.golden)
+    for name in [name for name in args.engines.split(',') if name] + args.engine:
+        results, seconds = run(load_engine(name), documents, args.tags, args.repeat)
+        rows.append((name, results, seconds, referenceResults))
+
+    failed = False
+    print('%-12s %10s %10s %12s  %s' % ('engine', 'docs/s', 'KB/s', 'max delta', 'mismatches'))
+    for name, results, seconds, expected in rows:
+        mismatches = []
+        largestDelta = 0.0
+        for document, expectedTags, actualTags in zip(documents, expected, results):
+            missing, extra, delta = compare(expectedTags, actualTags, args.tags, args.tolerance)
+            largestDelta = max(largestDelta, delta)
+            if missing or extra or delta > args.tolerance:
+                mismatches.append((document['id'], missing, extra, delta))
+        print('%-12s %10.1f %10.1f %12.3g  %d of %d' % (name, len(documents) / seconds, size / 1024.0 / seconds, largestDelta,
+                len(mismatches), len(documents)))
+        for documentId, missing, extra, delta in mismatches:
+            print('    %s: missing %s, extra %s, score delta %.3g' % (documentId, missing, extra, delta))
+        failed = failed or len(mismatches) > 0
+
+    if failed:
+        print('FAIL: tags differ')
+        return 1
+    return 0
+
+
+def _tags(tagSet):
+    return [(term.getValue(), term.getScore()) for term in tagSet.getTags()]
+
+
+def _encode(text):
+    # Python 2 takes str for text, a bytearray is read as bytes
+    if bytes is str:
+        return bytearray(text.encode('utf-8'))
+    return text.encode('utf-8')
+
+
+def _atCutoff(score, tags, n, tolerance):
+    # True if a tag with this score ties with the last tag of a list cut off at n tags
+    return len(tags) >= n > 0 and abs(score - tags[-1][1]) <= tolerance
+
+
+def _tagDocument(task):
+    document, n = task
+    return _tags(Tagger().analyse_text(document['text'], n, document.get('language')))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
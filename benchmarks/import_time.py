@@ -0,0 +1,73 @@
+"""
+       Import time benchmark
+
+       Measures how long a fresh interpreter takes to import autotagger.tagger and
+       checks that none of the heavy resources (stopword tables, the stemmer, the
+       whitelist, the regex engine) are loaded as a side effect of the import.
+       Exits with a non-zero status if the budget is exceeded.
+
+       Usage: python benchmarks/import_time.py [--budget-ms 30] [--runs 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'autotagger_app')
+
+MODULE = 'autotagger.tagger'
+
+# Modules that must only be loaded on first use
+LAZY_MODULES = [ 're', 'autotagger.stop_words', 'autotagger.stemmer', 'autotagger.whitelist', 'autotagger.detection',
+        'autotagger.languages.en' ]
+
+
+def measure_import_time():
+    # Returns the cumulative import time of MODULE in microseconds
+    if sys.version_info >= (3, 7):
+        output = subprocess.check_output([sys.executable, '-X', 'importtime', '-c', 'import ' + MODULE],
+                cwd=APP_DIR, stderr=subprocess.STDOUT).decode('utf-8')
+        for line in output.splitlines():
+            fields = [field.strip() for field in line.split('|')]
+            if len(fields) == 3 and fields[2] == MODULE:
+                return int(fields[1])
+        raise RuntimeError('No import time reported for ' + MODULE)
+    else:
+        # Older interpreters don't support -X importtime, timing the import statement instead
+        code = 'import timeit; start = timeit.default_timer(); import %s; print(int((timeit.default_timer() - start) * 1e6))' % MODULE
+        return int(subprocess.check_output([sys.executable, '-c', code], cwd=APP_DIR).decode('utf-8'))
+
+
+def eagerly_loaded_modules():
+    # Modules the interpreter already loads at startup (e.g. re on older versions) don't count
+    code = 'import sys; before = set(sys.modules); import %s; print(",".join(m for m in %r if m in sys.modules and m not in before))' % (MODULE, LAZY_MODULES)
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=APP_DIR).decode('utf-8').strip()
+    return [module for module in output.split(',') if module]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=30.0)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    # The first run also writes the byte code, so only the best of the remaining runs counts
+    measure_import_time()
+    best = min(measure_import_time() for run in range(args.runs))
+    print('import %s: %.2f ms (budget %.2f ms)' % (MODULE, best / 1000.0, args.budget_ms))
+
+    failed = False
+    if best / 1000.0 > args.budget_ms:
+        print('FAIL: import time over budget')
+        failed = True
+
+    eager = eagerly_loaded_modules()
+    if eager:
+        print('FAIL: loaded at import time: ' + ', '.join(eager))
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
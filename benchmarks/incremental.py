@@ -0,0 +1,112 @@
+"""
+       Incremental re-tagging benchmark
+
+       Builds a long article from the paragraphs of the given files (or of the golden
+       corpus and license.txt), makes a series of one-word edits to random paragraphs
+       and re-tags the article after each one, in full with Tagger.analyse_text and
+       incrementally with IncrementalTagger. Reports the median latency of both and
+       fails if their tags differ.
+
+       Usage: python benchmarks/incremental.py [files ...] [--size 200] [--edits 20] [-n 10]
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import timeit
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, '..', 'autotagger_app'))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from autotagger.tagger import Tagger
+from autotagger.incremental import IncrementalTagger
+from differential import compare, load_corpus, _tags
+
+
+def load_paragraphs(paths):
+    paragraphs = []
+    if paths:
+        for path in paths:
+            with io.open(path, encoding='utf-8') as stream:
+                paragraphs.extend(stream.read().split('\n'))
+    else:
+        for document in load_corpus(os.path.join(BENCHMARK_DIR, 'golden', 'corpus.jsonl')):
+            if document.get('language', 'en') == 'en':
+                paragraphs.extend(document['text'].split('\n'))
+    return [paragraph for paragraph in paragraphs if len(paragraph.split()) > 3]
+
+
+def make_article(paragraphs, size, generator):
+    # Paragraphs drawn at random until the article is size KB, numbered so that they are distinct
+    article = []
+    length = 0
+    while length < size * 1024:
+        paragraph = u'%d. %s' % (len(article) + 1, generator.choice(paragraphs))
+        article.append(paragraph)
+        length += len(paragraph.encode('utf-8')) + 1
+    return article
+
+
+def edit(article, generator):
+    index = generator.randrange(len(article))
+    words = article[index].split(' ')
+    words[generator.randrange(1, len(words))] = generator.choice([u'Python', u'release', u'markets', u'European', u'the'])
+    article[index] = u' '.join(words)
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('files', nargs='*', help='text files, split into paragraphs at line breaks')
+    parser.add_argument('--size', type=int, default=200, help='article size in KB')
+    parser.add_argument('--edits', type=int, default=20, help='one-word edits made to the article')
+    parser.add_argument('-n', '--tags', type=int, default=10)
+    args = parser.parse_args()
+
+    generator = random.Random(42)
+    article = make_article(load_paragraphs(args.files), args.size, generator)
+    tagger = Tagger()
+    incrementalTagger = IncrementalTagger(Tagger())
+    # The first version is analysed in full by both
+    text = u'\n'.join(article)
+    tagger.analyse_text(text, args.tags)
+    incrementalTagger.analyse_text(text, args.tags, documentId='article')
+
+    fullTimes = []
+    incrementalTimes = []
+    mismatches = 0
+    for i in range(args.edits):
+        edit(article, generator)
+        text = u'\n'.join(article)
+
+        start = timeit.default_timer()
+        expected = _tags(tagger.analyse_text(text, args.tags))
+        fullTimes.append(timeit.default_timer() - start)
+
+        start = timeit.default_timer()
+        actual = _tags(incrementalTagger.analyse_text(text, args.tags, documentId='article'))
+        incrementalTimes.append(timeit.default_timer() - start)
+
+        missing, extra, delta = compare(expected, actual, args.tags, 1e-9)
+        if missing or extra or delta > 1e-9:
+            mismatches += 1
+            print('edit %d: missing %s, extra %s, score delta %.3g' % (i + 1, missing, extra, delta))
+
+    print('%d paragraphs, %.1f KB, %d one-word edits' % (len(article), len(text.encode('utf-8')) / 1024.0, args.edits))
+    print('full:        %8.2f ms per edit (median)' % (median(fullTimes) * 1000))
+    print('incremental: %8.2f ms per edit (median)' % (median(incrementalTimes) * 1000))
+    if mismatches:
+        print('FAIL: tags differ after %d of %d edits' % (mismatches, args.edits))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
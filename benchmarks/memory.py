@@ -0,0 +1,138 @@
+"""
+       Memory budget benchmark
+
+       Tags adversarial inputs (a base64 blob, minified JavaScript, random words and
+       repeated prose) of growing size, each in a fresh process, with and without a
+       memory budget, and reports the latency, the peak RSS, the entries of the
+       language pack's vocabulary and whether the result was approximated. The random
+       words are also tagged whole with only MAX_UNIQUE_TERMS set, which keeps
+       evicting terms, and the run fails if a vocabulary grew past its size (by more
+       than what is added between two checks of it). The
+       input is read as text, as bytes or mapped into memory (mmap), the pages of a
+       mapped file are left out of the peak RSS since they are not copies of it.
+
+       Usage: python benchmarks/memory.py [--sizes 1,5,20] [--input text|bytes|mmap] [--max-text-length 1000000] [--max-unique-terms 20000]
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import subprocess
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'autotagger_app')
+
+sys.path.insert(0, APP_DIR)
+
+from autotagger.tagger import MAX_NGRAM_LENGTH_LIMIT, VOCABULARY_CHECK_INTERVAL
+
+# The vocabulary is checked every VOCABULARY_CHECK_INTERVAL tokens, each of which may add a token and an id per n-gram length
+VOCABULARY_SLACK = VOCABULARY_CHECK_INTERVAL * (MAX_NGRAM_LENGTH_LIMIT + 1)
+
+WORKER = '''
+import io, json, mmap, resource, sys, timeit
+sys.path.insert(0, %(app)r)
+from autotagger.tagger import Tagger
+from autotagger.languages import get_language_pack
+if %(input)r == 'text':
+    text = io.open(%(path)r, encoding='utf-8').read()
+elif %(input)r == 'bytes':
+    text = io.open(%(path)r, 'rb').read()
+else:
+    stream = open(%(path)r, 'rb')
+    text = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+tagger = Tagger()
+tagger.MAX_TEXT_LENGTH = %(maxTextLength)r
+tagger.MAX_UNIQUE_TERMS = %(maxUniqueTerms)r
+tagger.SAMPLE_LONG_TEXTS = True
+start = timeit.default_timer()
+tagSet = tagger.analyse_text(text, 10)
+seconds = timeit.default_timer() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+try:
+    # ru_maxrss survives fork and exec on Linux, the high water mark of this process's own memory is more accurate
+    status = dict(line.split(':', 1) for line in open('/proc/self/status'))
+    peak = int(status['VmHWM'].split()[0])
+    if %(input)r == 'mmap':
+        peak -= int(status['RssFile'].split()[0])
+except (IOError, KeyError):
+    pass
+vocabulary = get_language_pack(tagSet.language).vocabulary
+print(json.dumps({ 'seconds' : seconds, 'maxrss_kb' : peak, 'vocabulary' : vocabulary.getSize(), 'vocabulary_size' : vocabulary.MAX_SIZE,
+        'approximations' : tagSet.approximations, 'tags' : len(tagSet.getTags()) }))
+'''
+
+
+def make_input(kind, megabytes, path):
+    generator = random.Random(megabytes)
+    size = megabytes * 1000000
+    if kind == 'base64':
+        text = base64.b64encode(bytearray(generator.getrandbits(8) for i in range(size * 3 // 4))).decode('ascii')
+        text = '\n'.join(text[i:i + 76] for i in range(0, len(text), 76))
+    elif kind == 'minified-js':
+        parts = []
+        length = 0
+        while length < size:
+            name = ''.join(generator.choice('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ') for i in range(generator.randint(2, 12)))
+            part = 'var %s=function(t){return t.%sValue+%d};' % (name, name, generator.randint(0, 99999))
+            parts.append(part)
+            length += len(part)
+        text = ''.join(parts)
+    elif kind == 'random-words':
+        # Distinct made-up words, every one of them a new term for the vocabulary
+        words = []
+        length = 0
+        while length < size:
+            word = ''.join(generator.choice('abcdefghijklmnopqrstuvwxyz') for i in range(generator.randint(4, 10)))
+            words.append(word)
+            length += len(word) + 1
+        text = ' '.join(words)
+    else:
+        sample = open(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'license.txt')).read()
+        text = (sample * (size // len(sample) + 1))[:size]
+    with open(path, 'w') as stream:
+        stream.write(text)
+
+
+def run(path, input, maxTextLength, maxUniqueTerms):
+    code = WORKER % { 'app' : APP_DIR, 'path' : path, 'input' : input, 'maxTextLength' : maxTextLength, 'maxUniqueTerms' : maxUniqueTerms }
+    return json.loads(subprocess.check_output([sys.executable, '-c', code]).decode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1,5,20', help='input sizes in MB')
+    parser.add_argument('--input', choices=['text', 'bytes', 'mmap'], default='text', help='how the input file is read')
+    parser.add_argument('--max-text-length', type=int, default=1000000)
+    parser.add_argument('--max-unique-terms', type=int, default=20000)
+    parser.add_argument('--unbounded', action='store_true', help='also run without a budget (slow on large inputs)')
+    args = parser.parse_args()
+
+    path = os.path.join(os.environ.get('TMPDIR', '/tmp'), 'autotagger-memory-benchmark.txt')
+    print('%-12s %6s %-10s %10s %12s %12s  %s' % ('input', 'MB', 'budget', 'seconds', 'peak RSS MB', 'vocabulary', 'approximations'))
+    failed = False
+    try:
+        for kind in ['base64', 'minified-js', 'random-words', 'prose']:
+            for megabytes in [int(size) for size in args.sizes.split(',')]:
+                make_input(kind, megabytes, path)
+                budgets = [('bounded', args.max_text_length, args.max_unique_terms)]
+                if kind == 'random-words':
+                    budgets.append(('capped', None, args.max_unique_terms))
+                if args.unbounded:
+                    budgets.append(('unbounded', None, None))
+                for label, maxTextLength, maxUniqueTerms in budgets:
+                    result = run(path, args.input, maxTextLength, maxUniqueTerms)
+                    print('%-12s %6d %-10s %10.2f %12.1f %12d  %s' % (kind, megabytes, label, result['seconds'], result['maxrss_kb'] / 1024.0,
+                            result['vocabulary'], ', '.join(result['approximations']) or '-'))
+                    if label != 'unbounded' and result['vocabulary'] > result['vocabulary_size'] + VOCABULARY_SLACK:
+                        print('FAIL: the vocabulary holds %d entries, its size is %d' % (result['vocabulary'], result['vocabulary_size']))
+                        failed = True
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+       Sampling profiler benchmark
+
+       Tags the golden corpus (or the given files) over and over with profiling off,
+       with a fraction of the calls profiled and with every call profiled, and
+       reports the throughput of each against profiling off. The stage times of the
+       fully profiled runs are printed, and the collapsed stacks and slow-document
+       log can be written out (render the stacks with flamegraph.pl or speedscope).
+
+       Usage: python benchmarks/profiler.py [files ...] [--rate 0.01] [--rounds 5] [--stacks stacks.txt] [--slow-log slow.jsonl]
+"""
+import argparse
+import io
+import os
+import sys
+import timeit
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, '..', 'autotagger_app'))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from autotagger.tagger import Tagger
+from autotagger.profiling import SamplingProfiler
+from differential import load_corpus
+
+
+def load_documents(paths):
+    if not paths:
+        return [(document['text'], document.get('language')) for document in load_corpus(os.path.join(BENCHMARK_DIR, 'golden', 'corpus.jsonl'))]
+    documents = []
+    for path in paths:
+        with io.open(path, encoding='utf-8') as stream:
+            documents.append((stream.read(), None))
+    return documents
+
+
+def run(tagger, documents):
+    start = timeit.default_timer()
+    for text, language in documents:
+        tagger.analyse_text(text, 10, language)
+    return timeit.default_timer() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('files', nargs='*', help='text files, one document each')
+    parser.add_argument('--rate', type=float, default=0.01, help='fraction of the calls profiled in the sampled runs')
+    parser.add_argument('--rounds', type=int, default=5, help='rounds over the documents per mode, the fastest is reported')
+    parser.add_argument('--slow', type=float, default=0.1, help='seconds after which a document goes to the slow-document log')
+    parser.add_argument('--stacks', default=None, help='file to write the collapsed stacks of the fully profiled runs to')
+    parser.add_argument('--slow-log', default=None, help='file to write the slow-document log to')
+    args = parser.parse_args()
+
+    documents = load_documents(args.files) * 10
+    modes = [('off', 0, None), ('sampled', args.rate, SamplingProfiler(slowDocumentSeconds=args.slow, seed=1)),
+            ('every call', 1.0, SamplingProfiler(slowDocumentSeconds=args.slow, seed=1))]
+    taggers = []
+    for name, rate, profiler in modes:
+        tagger = Tagger()
+        tagger.PROFILE_SAMPLE_RATE = rate
+        tagger.profiler = profiler
+        taggers.append(tagger)
+    # Warming up the language packs and caches
+    for tagger in taggers:
+        run(tagger, documents)
+
+    # The modes take turns, so that they see the same machine
+    best = [None] * len(modes)
+    for i in range(args.rounds):
+        for index, tagger in enumerate(taggers):
+            seconds = run(tagger, documents)
+            if best[index] is None or seconds < best[index]:
+                best[index] = seconds
+
+    print('%-12s %10s %10s %10s' % ('profiling', 'docs/s', 'overhead', 'profiled'))
+    for (name, rate, profiler), seconds in zip(modes, best):
+        profiled = '%d/%d' % (profiler.profiledCalls, profiler.calls) if profiler is not None else '-'
+        print('%-12s %10.1f %9.1f%% %10s' % (name, len(documents) / seconds, (seconds / best[0] - 1) * 100, profiled))
+
+    profiler = modes[-1][2]
+    print('')
+    print('%-22s %10s %8s' % ('stage', 'seconds', 'share'))
+    for stage, seconds, share in profiler.getStageTimes():
+        print('%-22s %10.3f %7.1f%%' % (stage, seconds, share * 100))
+    if args.stacks:
+        profiler.writeCollapsedStacks(args.stacks)
+        print('collapsed stacks written to %s' % args.stacks)
+    if args.slow_log:
+        profiler.writeSlowDocuments(args.slow_log)
+        print('%d slow documents written to %s' % (len(profiler.slowDocuments), args.slow_log))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
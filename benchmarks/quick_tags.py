@@ -0,0 +1,107 @@
+"""
+       Quick tags benchmark
+
+       Tags long articles (built from the paragraphs of the given files, or of the
+       golden corpus and license.txt) with Tagger.quick_tags at a range of time
+       budgets, and reports per budget the median and 95th percentile latency, the
+       share of the full analysis' top tags found (overlap@n), how often the tags are
+       the same as those of Tagger.analyse_text and how often they are partial.
+       Fails if quick_tags with no practical limit differs from the full analysis.
+
+       Usage: python benchmarks/quick_tags.py [files ...] [--sizes 50,200,1000] [--budgets 1,2,5,10,20,50] [--rounds 5] [-n 10]
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import timeit
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, '..', 'autotagger_app'))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from autotagger.tagger import Tagger
+from differential import compare, _tags
+from incremental import load_paragraphs, make_article, median
+
+UNLIMITED = 3600.0 # Seconds, the budget of the run that must give the full tags
+
+
+def load_texts(paths, sizes):
+    # An article per size, and the license repeated to the largest size (a text whose top tags settle early)
+    generator = random.Random(42)
+    paragraphs = load_paragraphs(paths)
+    texts = [(u'article %d KB' % size, u'\n'.join(make_article(paragraphs, size, generator))) for size in sizes]
+    if not paths:
+        with io.open(os.path.join(BENCHMARK_DIR, '..', 'license.txt'), encoding='utf-8') as stream:
+            license = stream.read()
+        texts.append((u'license %d KB' % sizes[-1], license * max(sizes[-1] * 1024 // len(license), 1)))
+    return texts
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('files', nargs='*', help='text files, split into paragraphs at line breaks')
+    parser.add_argument('--sizes', default='50,200,1000', help='article sizes in KB')
+    parser.add_argument('--budgets', default='1,2,5,10,20,50', help='time budgets in milliseconds')
+    parser.add_argument('--rounds', type=int, default=5, help='calls per text and budget')
+    parser.add_argument('-n', '--tags', type=int, default=10)
+    args = parser.parse_args()
+
+    texts = load_texts(args.files, [int(size) for size in args.sizes.split(',')])
+    budgets = [float(budget) / 1000 for budget in args.budgets.split(',')] + [UNLIMITED]
+
+    tagger = Tagger()
+    expected = []
+    print('%-18s %14s' % ('text', 'full ms'))
+    for name, text in texts:
+        tagger.analyse_text(text, args.tags)
+        start = timeit.default_timer()
+        expected.append(_tags(tagger.analyse_text(text, args.tags)))
+        print('%-18s %14.2f' % (name, (timeit.default_timer() - start) * 1000))
+
+    print('')
+    print('%10s %10s %10s %12s %10s %10s' % ('budget ms', 'median ms', 'p95 ms', 'overlap@%d' % args.tags, 'same', 'partial'))
+    failed = False
+    for budget in budgets:
+        # A tagger per budget, quick_tags sizes its first piece from the rate of the calls before
+        tagger = Tagger()
+        tagger.quick_tags(texts[0][1], args.tags, budget)
+        times = []
+        overlap = 0.0
+        same = 0
+        partial = 0
+        for (name, text), full in zip(texts, expected):
+            for i in range(args.rounds):
+                start = timeit.default_timer()
+                tagSet = tagger.quick_tags(text, args.tags, budget)
+                times.append(timeit.default_timer() - start)
+                actual = _tags(tagSet)
+                missing, extra, delta = compare(full, actual, args.tags, 1e-9)
+                overlap += 1 - float(len(missing)) / max(len(full), 1)
+                if not missing and not extra and delta <= 1e-9:
+                    same += 1
+                elif budget == UNLIMITED:
+                    print('%s: missing %s, extra %s, score delta %.3g' % (name, missing, extra, delta))
+                    failed = True
+                if tagSet.isPartial():
+                    partial += 1
+        calls = float(len(times))
+        label = 'none' if budget == UNLIMITED else '%g' % (budget * 1000)
+        print('%10s %10.2f %10.2f %12.2f %9.0f%% %9.0f%%' % (label, median(times) * 1000, percentile(times, 0.95) * 1000,
+                overlap / calls, same / calls * 100, partial / calls * 100))
+    if failed:
+        print('FAIL: quick_tags with no time limit differs from the full analysis')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
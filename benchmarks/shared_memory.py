@@ -0,0 +1,122 @@
+"""
+       Shared resource segment benchmark
+
+       Starts N worker processes that each tag the same synthetic corpus (a large
+       vocabulary of made-up words), once with every worker building its own
+       vocabulary and once with the workers attached to a resource segment built from
+       the corpus (see autotagger.resources), and reports the total proportional set
+       size (PSS, shared pages are split between the processes sharing them) of the
+       workers while they are all alive, against an idle interpreter. Needs Linux
+       (/proc/<pid>/smaps_rollup).
+
+       Usage: python benchmarks/shared_memory.py [--workers 1,2,8,32] [--words 100000] [--documents 1000]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'autotagger_app')
+
+sys.path.insert(0, APP_DIR)
+
+WORKER = '''
+import json, sys
+sys.path.insert(0, %(app)r)
+from autotagger.tagger import Tagger
+if %(mode)r == 'segment':
+    from autotagger.resources import attach
+    attach(%(segment)r)
+if %(mode)r != 'idle':
+    tagger = Tagger()
+    for text in json.load(open(%(corpus)r)):
+        tagger.analyse_text(text, 10)
+sys.stdout.write('ready\\n')
+sys.stdout.flush()
+sys.stdin.read()
+'''
+
+
+def make_corpus(words, documents, generator):
+    # Made-up words (from syllables) drawn with a skewed distribution, so that most of the vocabulary is seen by every worker
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'ta', 'vo', 'zi', 'ben', 'dor', 'fal', 'gin', 'hap', 'jun', 'pel', 'sor', 'tur', 'wex']
+    vocabulary = set()
+    while len(vocabulary) < words:
+        vocabulary.add(''.join(generator.choice(syllables) for i in range(generator.randint(2, 5))))
+    vocabulary = sorted(vocabulary)
+    texts = []
+    for i in range(documents):
+        sentences = []
+        for j in range(20):
+            sentence = [vocabulary[int(len(vocabulary) * generator.random() ** 1.5)] for k in range(15)]
+            sentences.append(' '.join(sentence).capitalize() + '.')
+        texts.append(' '.join(sentences))
+    return texts
+
+
+def proportional_set_size(pid):
+    # PSS in KB
+    with open('/proc/%d/smaps_rollup' % pid) as stream:
+        for line in stream:
+            if line.startswith('Pss:'):
+                return int(line.split()[1])
+    return 0
+
+
+def run(mode, count, corpusPath, segmentPath):
+    code = WORKER % { 'app' : APP_DIR, 'mode' : mode, 'corpus' : corpusPath, 'segment' : segmentPath }
+    workers = []
+    try:
+        for i in range(count):
+            workers.append(subprocess.Popen([sys.executable, '-c', code], stdin=subprocess.PIPE, stdout=subprocess.PIPE))
+        for worker in workers:
+            if worker.stdout.readline().strip() != b'ready':
+                raise RuntimeError('worker %d failed' % worker.pid)
+        return sum(proportional_set_size(worker.pid) for worker in workers)
+    finally:
+        for worker in workers:
+            worker.stdin.close()
+            worker.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', default='1,2,8,32', help='numbers of worker processes')
+    parser.add_argument('--words', type=int, default=100000, help='distinct words in the corpus')
+    parser.add_argument('--documents', type=int, default=1000, help='documents in the corpus, tagged by every worker')
+    args = parser.parse_args()
+
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print('/proc/<pid>/smaps_rollup is not available, this benchmark needs Linux')
+        return 1
+
+    from autotagger.resources import build_segment
+
+    directory = tempfile.mkdtemp()
+    try:
+        corpusPath = os.path.join(directory, 'corpus.json')
+        segmentPath = os.path.join(directory, 'resources.seg')
+        texts = make_corpus(args.words, args.documents, random.Random(1))
+        with open(corpusPath, 'w') as stream:
+            json.dump(texts, stream)
+        build_segment(segmentPath, { 'en' : texts })
+        print('corpus: %d documents, segment: %.1f MB' % (len(texts), os.path.getsize(segmentPath) / 1048576.0))
+
+        print('%8s %14s %14s %14s %18s' % ('workers', 'idle MB', 'private MB', 'segment MB', 'segment/worker MB'))
+        for count in [int(count) for count in args.workers.split(',')]:
+            idle = run('idle', count, corpusPath, segmentPath) / 1024.0
+            private = run('private', count, corpusPath, segmentPath) / 1024.0
+            segment = run('segment', count, corpusPath, segmentPath) / 1024.0
+            # Memory over an idle interpreter, per worker
+            print('%8d %14.1f %14.1f %14.1f %18.2f' % (count, idle, private, segment, (segment - idle) / count))
+    finally:
+        shutil.rmtree(directory)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+       Configuration sweep benchmark
+
+       Grid searches Tagger boosts over a labelled set twice: once re-running the full
+       pipeline for every configuration, and once with SweepEvaluator, which extracts
+       candidates once and only re-scores them. Reports both timings and checks that
+       the two produce the same precision@k and recall@k.
+
+       Usage: python benchmarks/sweep.py [files ...] [--k 10] [--workers N]
+       (labelled .jsonl files, each line {"text": ..., "tags": [...]}, or text files,
+       which are labelled with the tags of the default configuration. Without files
+       the English texts of the golden corpus are used, labelled the same way)
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import timeit
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, '..', 'autotagger_app'))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from autotagger.evaluation import SweepEvaluator, parameter_grid, _configureTagger
+from autotagger.tagger import Tagger
+from differential import load_corpus
+
+GRID = {
+        'SINGLE_TERM_BOOST' : [ 0.5, 0.75, 1.0 ],
+        'BIGRAM_BOOST' : [ 1.5, 2.5, 3.5 ],
+        'CAPITALIZATION_BOOST' : [ 1.25, 1.75 ],
+        'TERM_FROM_COMPOUND_DOWNWEIGHT' : [ 0.25, 0.5 ]
+}
+
+
+def default_labels(text, k):
+    return [ term.getValue() for term in Tagger().analyse_text(text, k).getTags()[:k] ]
+
+
+def load_default_documents(k):
+    # The English texts of the golden corpus (license.txt among them) with tags to find
+    documents = []
+    for document in load_corpus(os.path.join(BENCHMARK_DIR, 'golden', 'corpus.jsonl')):
+        if document.get('language', 'en') == 'en':
+            labels = default_labels(document['text'], k)
+            if labels:
+                documents.append((document['text'], labels))
+    return documents
+
+
+def load_documents(paths, k):
+    if not paths:
+        return load_default_documents(k)
+    documents = []
+    for path in paths:
+        with io.open(path, encoding='utf-8') as stream:
+            if path.endswith('.jsonl'):
+                for line in stream:
+                    if line.strip():
+                        record = json.loads(line)
+                        documents.append((record['text'], record['tags']))
+            else:
+                text = stream.read()
+                documents.append((text, default_labels(text, k)))
+    return documents
+
+
+def naive_sweep(documents, parameterSets, k):
+    results = []
+    for parameters in parameterSets:
+        precision = recall = 0.0
+        for text, labels in documents:
+            tagger = _configureTagger(parameters)
+            tags = set(term.getValue().lower() for term in tagger.analyse_text(text, k).getTags()[:k])
+            hits = len(tags & set(label.lower() for label in labels))
+            precision += float(hits) / k
+            recall += float(hits) / max(len(labels), 1)
+        results.append((precision / len(documents), recall / len(documents)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('files', nargs='*', help='labelled .jsonl or text files')
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    documents = load_documents(args.files, args.k)
+    parameterSets = parameter_grid(GRID)
+
+    start = timeit.default_timer()
+    expected = naive_sweep(documents, parameterSets, args.k)
+    naiveSeconds = timeit.default_timer() - start
+
+    start = timeit.default_timer()
+    results = SweepEvaluator(documents, args.k, args.workers).evaluate(parameterSets)
+    sweepSeconds = timeit.default_timer() - start
+
+    mismatches = [ result['parameters'] for result, (precision, recall) in zip(results, expected)
+            if abs(result['precision'] - precision) > 1e-9 or abs(result['recall'] - recall) > 1e-9 ]
+
+    print('%d configurations x %d documents' % (len(parameterSets), len(documents)))
+    print('full pipeline per configuration: %.2f s' % naiveSeconds)
+    print('sweep evaluator: %.2f s (%.1fx)' % (sweepSeconds, naiveSeconds / sweepSeconds))
+    top = max(results, key=lambda result: result['precision'])
+    print('best precision@%d %.3f recall@%d %.3f with %s' % (args.k, top['precision'], args.k, top['recall'], top['parameters']))
+    if mismatches:
+        print('FAIL: %d configurations scored differently, e.g. %s' % (len(mismatches), mismatches[0]))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+       Trending tags ingest benchmark
+
+       Feeds a synthetic stream of tagged documents (Zipf distributed tags, one second
+       of stream time per 1000 documents) into TrendingTags and reports the ingest rate
+       and the latency of top-N queries, which are read from the maintained TOP_SIZE
+       strongest tags (queries for more tags scan all CAPACITY counters). Exits with a
+       non-zero status if ingest is slower than the target rate or the top tags differ
+       from the strongest counters.
+
+       Usage: python benchmarks/trending.py [--documents 100000] [--target 10000]
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'autotagger_app'))
+
+from autotagger.trending import TrendingTags
+
+
+def synthetic_documents(count, vocabularySize, tagsPerDocument, seed=42):
+    generator = random.Random(seed)
+    # Zipf-like popularity, a few tags are very common and most are rare
+    weights = [1.0 / rank for rank in range(1, vocabularySize + 1)]
+    cumulative = []
+    total = 0.0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    import bisect
+    vocabulary = ['tag%d' % rank for rank in range(vocabularySize)]
+    return [[vocabulary[bisect.bisect_left(cumulative, generator.random() * total)] for i in range(tagsPerDocument)] for document in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--documents', type=int, default=100000)
+    parser.add_argument('--vocabulary', type=int, default=100000)
+    parser.add_argument('--tags-per-document', type=int, default=10)
+    parser.add_argument('--capacity', type=int, default=1000)
+    parser.add_argument('--target', type=float, default=10000.0, help='minimum documents per second')
+    args = parser.parse_args()
+
+    documents = synthetic_documents(args.documents, args.vocabulary, args.tags_per_document)
+    trending = TrendingTags(args.capacity, halfLife=60.0)
+
+    start = timeit.default_timer()
+    for number, tags in enumerate(documents):
+        trending.addAll(tags, number / 1000.0)
+    elapsed = timeit.default_timer() - start
+    rate = args.documents / elapsed
+
+    now = args.documents / 1000.0
+    queries = 1000
+    queryTime = timeit.timeit(lambda: trending.top(10, now), number=queries) / queries
+    scanTime = timeit.timeit(lambda: trending.top(trending.TOP_SIZE + 1, now), number=queries) / queries
+    strongest = heapq.nlargest(10, trending._counts.values(), key=lambda counter: counter[0])
+    scale = trending.getCount(trending.top(1, now)[0][0], now) / strongest[0][0]
+    expected = [counter[0] * scale for counter in strongest]
+    actual = [count for tag, count, error in trending.top(10, now)]
+
+    print('ingest: %d documents in %.2f s, %.0f documents/s (target %.0f)' % (args.documents, elapsed, rate, args.target))
+    print('top(10): %.1f us per query over %d tracked tags' % (queryTime * 1e6, len(trending)))
+    print('top(%d): %.1f us per query, scanning every counter' % (trending.TOP_SIZE + 1, scanTime * 1e6))
+    print('top tags: ' + ', '.join('%s=%.1f' % (tag, count) for tag, count, error in trending.top(5, now)))
+    if rate < args.target:
+        print('FAIL: ingest below target')
+        return 1
+    if max(abs(a - b) for a, b in zip(actual, expected)) > 1e-9 * expected[0]:
+        print('FAIL: top tags differ from the strongest counters')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
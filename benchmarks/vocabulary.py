@@ -0,0 +1,87 @@
+"""
+       Term id allocation benchmark
+
+       Extracts the candidates of a batch of documents (the paragraphs of the given
+       files, or of license.txt) a few times over, keeping the frequency lists like a
+       batch job that merges or caches them, and reports per document: the time, the
+       memory allocated at the peak of the 1st pass, the memory retained by its lists
+       and how many distinct term id objects the lists hold per term (1.0 means every
+       entry has its own copy of the id). Needs tracemalloc (Python 3).
+
+       Usage: python benchmarks/vocabulary.py [files ...] [--passes 5]
+"""
+import argparse
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'autotagger_app'))
+
+from autotagger.tagger import Tagger
+
+LICENSE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'license.txt')
+
+
+def load_documents(paths):
+    documents = []
+    for path in paths:
+        with io.open(path, encoding='utf-8') as stream:
+            documents.extend(paragraph for paragraph in stream.read().split('\n\n') if paragraph.strip())
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('files', nargs='*', help='text files, split into documents at blank lines')
+    parser.add_argument('--passes', type=int, default=5, help='times the batch is extracted')
+    args = parser.parse_args()
+
+    try:
+        import tracemalloc
+    except ImportError:
+        print('tracemalloc is not available, run this with Python 3')
+        return 1
+
+    documents = load_documents(args.files or [LICENSE]) * args.passes
+    tagger = Tagger()
+    # Warming up, so that the language pack and its caches are not counted
+    for text in documents[:len(documents) // args.passes]:
+        tagger.extract_candidates(text)
+
+    start = timeit.default_timer()
+    for text in documents:
+        tagger.extract_candidates(text)
+    seconds = timeit.default_timer() - start
+
+    kept = []
+    peak = 0
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for text in documents:
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        kept.append(tagger.extract_candidates(text))
+        peak += tracemalloc.get_traced_memory()[1] - current
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    entries = 0
+    termIds = set()
+    for frequencyLists in kept:
+        for frequencyList in frequencyLists.getLists():
+            for term in frequencyList.getTerms().values():
+                entries += 1
+                termIds.add(id(term.getTermId()))
+
+    count = len(documents)
+    print('%d documents, %d list entries' % (count, entries))
+    print('time:            %8.1f us per document' % (seconds / count * 1e6))
+    print('peak allocated:  %8.1f KB per document' % (peak / 1024.0 / count))
+    print('retained:        %8.1f KB per document' % (retained / 1024.0 / count))
+    print('term id objects: %8.3f per list entry' % (float(len(termIds)) / max(entries, 1)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())